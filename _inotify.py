@@ -0,0 +1,126 @@
+"""Minimal ctypes binding to Linux inotify for the dev server.
+
+Used by server.py when watchdog is not installed, so the watcher thread
+blocks in select() until the kernel reports a change instead of rescanning
+the tree every second. ``available`` is False off Linux (or if libc cannot
+be loaded); callers should fall back to polling in that case.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+
+IN_MODIFY = 0x00000002
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+WATCH_MASK = IN_MODIFY | IN_CREATE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF
+
+# struct inotify_event { int wd; uint32_t mask; uint32_t cookie; uint32_t len; char name[]; }
+_EVENT = struct.Struct('iIII')
+
+_libc = None
+if sys.platform.startswith('linux'):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        _libc.inotify_init1.argtypes = [ctypes.c_int]
+        _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        _libc = None
+
+available = _libc is not None
+
+
+class Inotify:
+    """Recursive inotify watch over ``root``, skipping directories named in ``ignore_dirs``."""
+
+    def __init__(self, root, ignore_dirs=()):
+        if not available:
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        self.ignore_dirs = frozenset(ignore_dirs)
+        self.fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._paths = {}
+        self.add_tree(str(root))
+
+    def add_watch(self, path):
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            # The directory may already be gone again (e.g. a temp dir); not fatal
+            return
+        self._paths[wd] = path
+
+    def add_tree(self, root):
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            self.add_watch(path)
+            try:
+                it = os.scandir(path)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    if entry.name not in self.ignore_dirs and entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+
+    def wait(self, timeout=None):
+        """Block until events are readable; returns False on timeout."""
+        return bool(select.select([self.fd], [], [], timeout)[0])
+
+    def read_events(self):
+        """Read pending events and return the affected file paths.
+
+        New directories are watched as they appear. On queue overflow the
+        returned list contains ``None`` so callers can rebuild unconditionally.
+        """
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        offset = 0
+        size = _EVENT.size
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + size:offset + size + length].rstrip(b'\0')
+            offset += size + length
+
+            if mask & IN_Q_OVERFLOW:
+                paths.append(None)
+                continue
+            if mask & IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+
+            parent = self._paths.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, os.fsdecode(name))
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and os.path.basename(path) not in self.ignore_dirs:
+                    self.add_tree(path)
+                continue
+            paths.append(path)
+        return paths
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import sys
+
+import pytest
+
+# Make the in-repo metafor and metafor_cli packages importable from every test
+# directory. Computed once here instead of per test module; the membership check
+# keeps repeated collection from growing sys.path (every import scans it).
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+for _path in (_ROOT, os.path.join(_ROOT, 'metafor_cli')):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from metafor_cli.builder import install_browser_stubs
+
+# Browser-only modules are mocked once for the whole test session, before any test
+# module imports metafor (pytest loads conftest.py first)
+install_browser_stubs()
+
+
+@pytest.fixture(scope="session")
+def metafor_compiler():
+    # One compiler (and libsass setup) shared by every test that compiles .ptml
+    from metafor.compiler import MetaforCompiler
+    try:
+        import sass
+        # Load the extension and run its first parse during fixture setup, so the
+        # cold start is not charged to whichever Sass test runs first
+        sass.compile(string="a{b:c}")
+    except Exception:
+        pass
+    return MetaforCompiler()
+
+
+@pytest.fixture(scope="session")
+def cached_compile(metafor_compiler, request):
+    # Memoize compile output on disk under .pytest_cache. The key covers the source,
+    # the filename, the compiler package sources and the libsass version, so editing
+    # the compiler (the thing under test) invalidates every entry. With the cache
+    # plugin disabled (-p no:cacheprovider) sources are compiled directly.
+    cache = getattr(request.config, 'cache', None)
+    if cache is None:
+        return lambda source, filename: metafor_compiler.compile(source, filename=filename)
+
+    import sass
+    compiler_dir = os.path.join(_ROOT, 'metafor', 'compiler')
+    digest = hashlib.sha256(sass.__version__.encode())
+    for name in sorted(os.listdir(compiler_dir)):
+        if name.endswith('.py'):
+            with open(os.path.join(compiler_dir, name), 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read())
+    cache_dir = cache.mkdir('metafor_compile')
+
+    def compile_source(source, filename):
+        key = digest.copy()
+        key.update(filename.encode() + b'\0' + source.encode())
+        path = cache_dir / key.hexdigest()
+        try:
+            return path.read_text()
+        except FileNotFoundError:
+            pass
+        compiled = metafor_compiler.compile(source, filename=filename)
+        path.write_text(compiled)
+        return compiled
+
+    return compile_source
@@ -16,6 +16,22 @@ DEFAULT_DEBOUNCE_MS = 200
 
 _UNSET = object()
 
+# Parsed field paths, shared by every form: "items[0].name" -> (("items", "0"), ("name", None))
+_PATH_SEGMENTS: Dict[str, tuple] = {}
+
+def _path_segments(path: str) -> tuple:
+    segments = _PATH_SEGMENTS.get(path)
+    if segments is None:
+        parsed = []
+        for part in path.split('.'):
+            if '[' in part and part.endswith(']'):
+                field_name, index_str = part.split('[', 1)
+                parsed.append((field_name, index_str[:-1]))  # Remove the closing ']'
+            else:
+                parsed.append((part, None))
+        segments = _PATH_SEGMENTS[path] = tuple(parsed)
+    return segments
+
 class FieldUsage:
     """
     Represents metadata about a form field.
@@ -63,14 +79,28 @@ class FieldAccessProxy:
     """
     Proxy for cleaner field access syntax.
     Enables usage like: form.F.user.email or form.F.items[0].name
+
+    Proxies are shared per path through the form's proxy cache, and each one
+    resolves its FieldUsage once; meta reads refresh that handle in place.
     """
+    __slots__ = ('_form', '_path', '_field')
+
     def __init__(self, form: 'Form', path: str = ""):
         self._form = form
         self._path = path
+        # Every slot is set here: an unset slot would fall through to __getattr__
+        self._field = None
+
+    def _child(self, new_path: str) -> 'FieldAccessProxy':
+        cache = self._form._proxy_cache
+        proxy = cache.get(new_path)
+        if proxy is None:
+            proxy = cache[new_path] = FieldAccessProxy(self._form, new_path)
+        return proxy
 
     def __getattr__(self, name: str) -> 'FieldAccessProxy':
         new_path = f"{self._path}.{name}" if self._path else name
-        return FieldAccessProxy(self._form, new_path)
+        return self._child(new_path)
 
     def __getitem__(self, key: Union[int, str]) -> 'FieldAccessProxy':
         if isinstance(key, int):
@@ -79,15 +109,20 @@ class FieldAccessProxy:
         else:
             # Dict key: items['name'] (rarely used but supported)
             new_path = f"{self._path}.{key}" if self._path else key
-        return FieldAccessProxy(self._form, new_path)
+        return self._child(new_path)
 
     def _get_field(self) -> FieldUsage:
-        field = self._form.field(self._path)
+        # The handle's value()/set_value() read the form live; its meta snapshot is
+        # refreshed through .meta, which every meta accessor (and __call__) goes through
+        field = self._field
         if field is None:
-            # Should we return a dummy or error?
-            # Existing behavior of field() prints warning and returns None.
-            # But let's assume valid access for now or let it fail if user tries to specific ops
-            raise AttributeError(f"Field '{self._path}' not found")
+            field = self._form.field(self._path)
+            if field is None:
+                # Should we return a dummy or error?
+                # Existing behavior of field() prints warning and returns None.
+                # But let's assume valid access for now or let it fail if user tries to specific ops
+                raise AttributeError(f"Field '{self._path}' not found")
+            self._field = field
         return field
 
     @property
@@ -124,7 +159,8 @@ class FieldAccessProxy:
     # Allow calling the proxy to get the raw FieldUsage object if needed, 
     # though properties cover most cases.  
     def __call__(self) -> FieldUsage:
-        return self._get_field()
+        # The cached handle's valid/errors/touched/dirty are snapshots; refresh them
+        return self._get_field().meta
         
 class Form:
     """
@@ -149,13 +185,17 @@ class Form:
             "validated_at": None
         })
 
+        # Field access proxies keyed by path, shared by every form.F lookup
+        self._proxy_cache = {}
+        self._root_proxy = FieldAccessProxy(self)
+
     @property
     def F(self) -> FieldAccessProxy:
         """
         Returns a FieldAccessProxy for cleaner field access syntax.
         Usage: form.F.user.email
         """
-        return FieldAccessProxy(self)
+        return self._root_proxy
         
     def field(self, field_name: str) -> Any:
         current_val = self.get_nested_value(field_name) if "." in field_name or "[" in field_name else self.form_data().get(field_name)
@@ -722,19 +762,18 @@ class Form:
         Args:
             path: Dotted path to the value, e.g. "user.address.street"
         """
-        parts = path.split('.')
         value = self.form_data()
         
-        for part in parts:
+        # Field value() reads land here on every render, so the path is parsed once
+        for part, index_str in _path_segments(path):
             # Handle array indexing
-            if '[' in part and part.endswith(']'):
-                field_name, index_str = part.split('[', 1)
-                index = int(index_str[:-1])  # Remove the closing ']'
+            if index_str is not None:
+                index = int(index_str)
                 
-                if not value or field_name not in value:
+                if not value or part not in value:
                     return None
                     
-                array_value = value[field_name]
+                array_value = value[part]
                 if not isinstance(array_value, list) or index >= len(array_value):
                     return None
                     
@@ -12,6 +12,33 @@ from metafor.form.validator import Validator
 
 T = TypeVar('T')
 _UNSET = object() # Sentinel object to differentiate unset initial value from None initial value
+# Immutable value types whose equality is enough to reuse a cross-validator result
+_SCALAR_TYPES = (str, int, float, bool, Date)
+
+def _parse_key(key: str) -> tuple:
+    # "items[0].qty" -> ("items", 0, "qty")
+    parts = []
+    for part in key.split('.'):
+        if '[' in part and part.endswith(']'):
+            name, index = part.split('[', 1)
+            parts.append(name)
+            parts.append(int(index[:-1]))
+        else:
+            parts.append(part)
+    return tuple(parts)
+
+def _resolve_key(data: Any, parts: tuple) -> Any:
+    # Value at a parsed key, or _UNSET when any step of the path is missing
+    for part in parts:
+        if isinstance(part, int):
+            if not isinstance(data, list) or part >= len(data):
+                return _UNSET
+            data = data[part]
+        else:
+            if not isinstance(data, dict) or part not in data:
+                return _UNSET
+            data = data[part]
+    return data
 
 class Field:
     """
@@ -273,6 +300,9 @@ class Schema:
         self.nested_schemas: Dict[str, 'Schema'] = {}
         self.field_arrays: Dict[str, FieldArray] = {}
         self.cross_validators: List[Callable[[Dict[str, Any]], Optional[Dict[str, str]]]] = []
+        # Declared input keys per cross-validator, and its last (inputs, result)
+        self._validator_keys: Dict[Callable, tuple] = {}
+        self._validator_results: Dict[Callable, tuple] = {}
 
     def field(self, name: str) -> Field:
         """Adds a field to the schema."""
@@ -298,14 +328,36 @@ class Schema:
         self.field_arrays[name] = field_array
         return field_array
         
-    def add_validator(self, validator: Callable[[Dict[str, Any]], Optional[Dict[str, List[str]]]]) -> 'Schema':
+    def add_validator(self, validator: Callable[[Dict[str, Any]], Optional[Dict[str, List[str]]]],
+                      keys: Optional[List[str]] = None) -> 'Schema':
         """
         Adds a cross-field validator. 
         The validator receives the entire form data and should return a dict of errors 
         (field_name -> error_list) or None if valid.
+        If `keys` lists the fields the validator reads, it is only re-run when one of
+        those values changes; otherwise its previous result is reused.
         """
         self.cross_validators.append(validator)
-        return self
+        if keys is not None:
+            # Dotted/indexed keys ("user.pw", "items[0].qty") are resolved through nested data
+            self._validator_keys[validator] = tuple(_parse_key(key) for key in keys)
+        return self
+
+    def _run_cross_validator(self, validator: Callable, form_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        keys = self._validator_keys.get(validator)
+        if keys is None:
+            return validator(form_data)
+        inputs = tuple(_resolve_key(form_data, key) for key in keys)
+        # Mutable values could change in place behind an equal-looking snapshot
+        if not all(value is None or value is _UNSET or isinstance(value, _SCALAR_TYPES) for value in inputs):
+            self._validator_results.pop(validator, None)
+            return validator(form_data)
+        cached = self._validator_results.get(validator)
+        if cached is not None and cached[0] == inputs:
+            return cached[1]
+        result = validator(form_data)
+        self._validator_results[validator] = (inputs, result)
+        return result
 
     def validate(self, form_data: Dict[str, Any]) -> Dict[str, List[str]]:
         """Validates the form data against the schema."""
@@ -419,7 +471,7 @@ class Schema:
         
         # Run cross-field validators
         for validator in self.cross_validators:
-            cross_errors = validator(form_data)
+            cross_errors = self._run_cross_validator(validator, form_data)
             if cross_errors:
                 for field, field_errors in cross_errors.items():
                     if field not in errors:
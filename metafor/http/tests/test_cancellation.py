@@ -1,14 +1,9 @@
 
-import sys
 from unittest.mock import MagicMock, patch
 
-# Mock js module
-sys.modules["js"] = MagicMock()
-# Mock AbortController
-mock_abort_controller = MagicMock()
-sys.modules["js"].AbortController = mock_abort_controller
-sys.modules["pyodide"] = MagicMock()
-sys.modules["pyodide.ffi"] = MagicMock()
+# The session-wide js mock (conftest.py) hands out the same AbortController mock to
+# metafor.http and to this test
+from js import AbortController as mock_abort_controller
 
 import asyncio
 import unittest
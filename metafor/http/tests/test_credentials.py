@@ -1,12 +1,6 @@
 
-import sys
 from unittest.mock import MagicMock, patch
 
-# Mock js and pyodide modules before importing metafor
-sys.modules["js"] = MagicMock()
-sys.modules["pyodide"] = MagicMock()
-sys.modules["pyodide.ffi"] = MagicMock()
-
 import asyncio
 import unittest
 from metafor.http.client import Http
@@ -1,6 +1,7 @@
 from enum import Enum
 import re
 from collections import deque
+from functools import lru_cache
 from js import window, console
 from pyodide.ffi import create_proxy
 from metafor.core import create_effect, create_signal, track
@@ -14,13 +15,20 @@ from typing import Any, Dict, Tuple, Callable, Optional, Pattern, List
 
 from metafor.core import batch_updates
 
+_OPTIONAL_PARAM_RE = re.compile(r':(\w+)\?')
+_WILDCARD_RE = re.compile(r'\*')
+_PARAM_RE = re.compile(r':(\w+)')
+
+@lru_cache(maxsize=None)
 def _str_to_regex_path(path: str) -> Tuple[str, Pattern]:
     """Utility function to convert a path string to a regex pattern."""
+    # Memoized: the same page paths are compiled by every Router and on each
+    # param redirect, and the (str, Pattern) result is immutable
     # Handle optional parameters (e.g., /users/:id?/:optional?)
-    path = re.sub(r':(\w+)\?', r'(?P<\1>[^/]*)?', path)
+    path = _OPTIONAL_PARAM_RE.sub(r'(?P<\1>[^/]*)?', path)
     # Handle wildcards (e.g., /files/*)
-    path = re.sub(r'\*', r'(?P<wildcard>.*)', path)
-    regex_path = f"^{re.sub(r':(\w+)', r'(?P<\1>[^/]+)', path)}$"
+    path = _WILDCARD_RE.sub(r'(?P<wildcard>.*)', path)
+    regex_path = f"^{_PARAM_RE.sub(r'(?P<\1>[^/]+)', path)}$"
     return regex_path, re.compile(regex_path)
 
 class RouteMode(Enum):
@@ -50,7 +58,9 @@ class Route:
     @path.setter
     def path(self, path: str | Pattern):
         self._path = path
-        self._compiled_regex = re.compile(path) if isinstance(path, str) else path
+        # String paths are compiled on first use: hooks temporarily swap in concrete
+        # paths like "/users/123", which should not cost a re.compile per navigation
+        self._compiled_regex = None if isinstance(path, str) else path
 
     @property
     def component(self):
@@ -58,6 +68,8 @@ class Route:
 
     @property
     def compiled_regex(self):
+        if self._compiled_regex is None and self._path is not None:
+            self._compiled_regex = re.compile(self._path)
         return self._compiled_regex
 
     def _compile_children(self, children: List['Route']) -> Dict[Pattern, 'Route']:
@@ -75,6 +87,7 @@ class Route:
             normalized_path = child_path.lstrip('/')
             regex_path, regex_compiled = _str_to_regex_path(normalized_path)
             route.path = regex_path
+            route._compiled_regex = regex_compiled
             compiled_children[regex_compiled] = route
         return compiled_children
 
@@ -96,9 +109,14 @@ class Router:
                  mode: str = HASH_MODE, base_path: str = ""):
         
         self.routes = self._compile_routes(routes)
+        # Unanchored-at-end variants of parent route patterns, used for prefix matching
+        self._prefix_regexes = {}
+        self._compile_prefix_regexes(self.routes)
         self._current_component = None
         self.before_hooks = before_hooks or []
         self.after_hooks = after_hooks or []
+        # In-flight after-hook tasks; holding them keeps the loop from dropping one mid-run
+        self._after_hook_tasks = set()
         self.mode = mode
         self.base_path = base_path.rstrip('/')  # Remove trailing slash if present
 
@@ -142,9 +160,17 @@ class Router:
             normalized_path = path.lstrip('/')
             regex_path, regex_compiled = _str_to_regex_path(normalized_path)
             route.path = regex_path
+            route._compiled_regex = regex_compiled
             compiled_routes[regex_compiled] = route
         return compiled_routes
 
+    def _compile_prefix_regexes(self, routes: Dict[Pattern, Route]) -> None:
+        """Precompile the prefix-match regex of every route that has children."""
+        for regex, route in routes.items():
+            if route.children:
+                self._prefix_regexes[regex] = re.compile(regex.pattern[:-1])
+                self._compile_prefix_regexes(route.children)
+
     def _parse_path_parameters(self, path: str, regex: Pattern) -> Dict[str, str]:
         """Extract parameters from path based on a specific route pattern."""
         match = regex.match(path)
@@ -292,10 +318,12 @@ class Router:
             
             if from_route:
                 original_from_path = from_route.path
+                original_from_regex = from_route._compiled_regex
                 from_route.path = prev_route_path_str
             
             if to_route:
                 original_to_path = to_route.path
+                original_to_regex = to_route._compiled_regex
                 to_route.path = deepest_route_path_str
             
             # Pass matched_routes in kwargs
@@ -304,8 +332,10 @@ class Router:
             # Restore original paths
             if original_from_path is not None:
                 from_route.path = original_from_path
+                from_route._compiled_regex = original_from_regex
             if original_to_path is not None:
                 to_route.path = original_to_path
+                to_route._compiled_regex = original_to_regex
             
             if stop_on_failure:
                 # Interpret result for blocking hooks
@@ -319,6 +349,22 @@ class Router:
 
         return True, None
 
+    def _schedule_after_hooks(self, path: str, params: Dict[str, str],
+                              matched_routes: Optional[List[Tuple[Route, Dict[str, str]]]]) -> None:
+        """Run the after hooks in the background without blocking navigation."""
+        if not self.after_hooks:
+            # Nothing to run: skip the task and its route matching
+            return
+        task = asyncio.create_task(self._execute_hooks(self.after_hooks, path, params,
+                                                       matched_routes=matched_routes, stop_on_failure=False))
+        self._after_hook_tasks.add(task)
+        task.add_done_callback(self._after_hook_tasks.discard)
+
+    async def _pending_after_hooks(self) -> None:
+        """Wait for every after-hook task scheduled so far to finish."""
+        while self._after_hook_tasks:
+            await asyncio.gather(*self._after_hook_tasks)
+
     def _resolve_redirect(self, redirect_info: Any) -> Tuple[Optional[str], Dict[str, str]]:
         """Resolve a redirect object (str or dict) to a path string and query params."""
         if isinstance(redirect_info, str):
@@ -435,7 +481,7 @@ class Router:
         prev_route_obj = prev_matched[-1][0] if prev_matched else None
 
         # Execute after hooks
-        asyncio.create_task(self._execute_hooks(self.after_hooks, path, deepest_params, matched_routes=None, stop_on_failure=False))
+        self._schedule_after_hooks(path, deepest_params, None)
 
         if event and path != self.last_valid_route:
             self._update_history(path, query_params)
@@ -567,7 +613,7 @@ class Router:
         prev_route_obj = prev_matched[-1][0] if prev_matched else None
 
         # Execute after hooks
-        asyncio.create_task(self._execute_hooks(self.after_hooks, path, deepest_params, matched_routes=matched_routes_with_params, stop_on_failure=False))
+        self._schedule_after_hooks(path, deepest_params, matched_routes_with_params)
 
         query_string = ""
         if query_params:
@@ -688,7 +734,10 @@ class Router:
             full_path = f"{base_path}{pattern_str}"
 
             # Try to match as a prefix
-            match = re.search(regex.pattern[:-1], path)  # Partial match for routes with children
+            prefix_regex = self._prefix_regexes.get(regex)
+            if prefix_regex is None:
+                prefix_regex = self._prefix_regexes[regex] = re.compile(regex.pattern[:-1])
+            match = prefix_regex.search(path)  # Partial match for routes with children
 
             if match:
                 params = match.groupdict() if match.lastindex else {}
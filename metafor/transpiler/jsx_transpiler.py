@@ -1,19 +1,44 @@
+import os
 import pathlib
 from .tokenizer import JSXTokenizer, TokenType, Token
 from .parser import JSXParser, JSXNode, JSXElement, JSXText, JSXExpression
 from .code_generator import JSXCodeGenerator, ComponentType
 
+# Generated code for .jsx files keyed by (path, css_variable) -> (st_mtime_ns, code);
+# a file is re-transpiled once its mtime changes. Inline templates are not cached, so
+# dynamically built templates cannot grow this for the life of the page.
+_JSX_CACHE = {}
+
+
+def _jsx_mtime(jsx_template: str):
+    if not jsx_template.endswith(".jsx"):
+        return None
+    try:
+        return os.stat(jsx_template).st_mtime_ns
+    except (OSError, ValueError):
+        return None
+
+
 def jsx_to_dom_func(jsx_template: str, scope: dict = None, css_variable: str = None):
-    jsx_template = load_jsx_as_docstring(jsx_template)
+    key = (jsx_template, css_variable)
+    mtime = _jsx_mtime(jsx_template)
+    cached = _JSX_CACHE.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    source = load_jsx_as_docstring(jsx_template)
     
-    tokenizer = JSXTokenizer(jsx_template)
+    tokenizer = JSXTokenizer(source)
     tokens = tokenizer.tokenize()
     
     parser = JSXParser(tokens)
     nodes = parser.parse()
     
     generator = JSXCodeGenerator(css_variable=css_variable)
-    return generator.generate(nodes)
+    code = generator.generate(nodes)
+    if mtime is not None:
+        _JSX_CACHE[key] = (mtime, code)
+    return code
 
 
 def load_jsx_as_docstring(file_path):
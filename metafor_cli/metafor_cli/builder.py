@@ -1,15 +1,40 @@
 import os
 import sys
+import types
 from unittest.mock import MagicMock
 
-# Mock JS environment if not already mocked
-# This is required because metafor package imports 'js' which exists only in Pyodide
-if 'js' not in sys.modules:
-    sys.modules['js'] = MagicMock()
-if 'pyodide' not in sys.modules:
-    sys.modules['pyodide'] = MagicMock()
-if 'pyodide.ffi' not in sys.modules:
-    sys.modules['pyodide.ffi'] = MagicMock()
+# Names the framework imports from js at module level; each gets its own mock object
+JS_NAMES = (
+    'AbortController', 'ArrayBuffer', 'FormData', 'IDBKeyRange', 'Object', 'Promise',
+    'Uint8Array', 'WebSocket', 'console', 'document', 'fetch', 'indexedDB',
+    'localStorage', 'sessionStorage', 'setTimeout', 'window',
+)
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+def install_browser_stubs():
+    # The metafor package imports 'js' and 'pyodide', which exist only in Pyodide.
+    # Shared by the CLI build, the test suite (conftest.py) and test_app's build
+    # script; modules already present are left alone. Plain modules with an explicit
+    # name list keep top-level lookups from growing a MagicMock child tree.
+    if 'js' not in sys.modules:
+        sys.modules['js'] = _module('js', **{name: MagicMock() for name in JS_NAMES})
+    if 'pyodide.ffi' not in sys.modules:
+        sys.modules['pyodide.ffi'] = _module(
+            'pyodide.ffi',
+            create_proxy=lambda func: func,
+            to_js=lambda value, *args, **kwargs: value,
+            # Mock objects stand in for JS values, so they must pass isinstance(x, JsProxy)
+            JsProxy=MagicMock,
+            JsException=type('JsException', (Exception,), {}),
+        )
+    if 'pyodide' not in sys.modules:
+        sys.modules['pyodide'] = _module('pyodide', ffi=sys.modules['pyodide.ffi'])
+
+install_browser_stubs()
 
 # Development mode hack: Try to find metafor in parent directories
 # This ensures we use the local metafor source if valid
@@ -22,7 +47,7 @@ if project_root not in sys.path:
 # Import bundler from the local package
 from .bundler import MetaforBundler
 
-def build_project(base_dir, output_type='pyc'):
+def build_project(base_dir, output_type='pyc', changed=None, is_watched=None):
     src_dir = base_dir
     out_dir = os.path.join(base_dir, "build")
     pyscript_toml = os.path.join(base_dir, "pyscript.toml")
@@ -53,6 +78,6 @@ def build_project(base_dir, output_type='pyc'):
     # print(f"Using framework from {framework_dir}")
 
     bundler = MetaforBundler(src_dir=src_dir, out_dir=out_dir, pyscript_toml=pyscript_toml, framework_dir=framework_dir, use_pyc=use_pyc)
-    bundler.build()
+    bundler.build(changed=changed, is_watched=is_watched)
     
     # print(f"Build complete.")
@@ -4,49 +4,187 @@ import pathlib
 import hashlib
 import json
 import concurrent.futures
-import time
+import sys
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 # from metafor.compiler import MetaforCompiler
 
+# os.sendfile only accepts regular-file destinations on Linux
+_HAS_SENDFILE = hasattr(os, 'sendfile') and sys.platform.startswith('linux')
+
+def _fast_copy(src, dst):
+    # Copy file contents only (no metadata) - consumers rely on the hash cache, not mtimes.
+    # On Linux the copy happens in-kernel via sendfile, avoiding userspace read/write buffers.
+    if _HAS_SENDFILE:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                infd, outfd = fsrc.fileno(), fdst.fileno()
+                size = os.fstat(infd).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(outfd, infd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            return
+        except OSError:
+            # Some filesystems reject sendfile; fall through to the portable copy
+            pass
+    shutil.copyfile(src, dst)
+
+# PTML compilation runs in a lazily created process pool. Workers come from a
+# forkserver, not a plain fork: under `serve` the pool is first needed after the HTTP,
+# watcher and SSE threads are running, and forking a multi-threaded process can
+# deadlock. The initializer hands workers the parent's sys.path and browser-module
+# stubs. Other platforms stay on threads, as do tiny batches where start-up dominates.
+_USE_PROCESS_POOL = sys.platform.startswith('linux')
+_PROCESS_POOL_MIN_TASKS = 4
+_compile_ptml_pool = None
+# One MetaforCompiler per worker (process or thread); compile() keeps per-call state
+# on the instance, so a single instance must not be shared between threads.
+_worker_state = threading.local()
+
+def _init_worker():
+    # Import and construct the compiler once per worker rather than once per task
+    from metafor.compiler import MetaforCompiler
+    _worker_state.compiler = MetaforCompiler()
+
+def _init_process_worker(parent_sys_path):
+    # Workers start from a fresh interpreter: match the parent's import path (framework
+    # parent dir, CLI dev checkout), then let builder install the js/pyodide stubs
+    sys.path[:] = parent_sys_path
+    from . import builder  # noqa: F401
+    _init_worker()
+
+def _get_compile_ptml_pool():
+    global _compile_ptml_pool
+    if _compile_ptml_pool is None:
+        import multiprocessing
+        _compile_ptml_pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context('forkserver'),
+            initializer=_init_process_worker,
+            initargs=(list(sys.path),),
+        )
+    return _compile_ptml_pool
+
+def _compile_ptml_source(source, filename):
+    compiler = getattr(_worker_state, 'compiler', None)
+    if compiler is None:
+        _init_worker()
+        compiler = _worker_state.compiler
+    return compiler.compile(source, filename=filename)
+
+# Project-level files that never go into the wheel; COPY_TO_OUT ones are copied as-is to the build dir
+EXCLUDED_FILES = frozenset({'pyscript.toml', 'index.html', 'build.py', 'main.py', 'setup.py'})
+COPY_TO_OUT = frozenset({'index.html', 'pyscript.toml', 'main.py'})
+
+def _rel_prefix(root, base):
+    # "" for base itself, otherwise the POSIX-style relative dir with a trailing slash
+    rel = os.path.relpath(root, base)
+    if rel == '.':
+        return ''
+    if os.sep != '/':
+        rel = rel.replace(os.sep, '/')
+    return rel + '/'
+
+# Prefix that keeps framework keys in cache.json apart from project-relative ones
+_FRAMEWORK_KEY_PREFIX = 'framework:'
+
 class BuildCache:
-    def __init__(self, cache_file):
+    def __init__(self, cache_file, root_dir=None, framework_dir=None):
         self.cache_file = pathlib.Path(cache_file)
-        self.cache = self._load_cache()
+        # Keys are stored relative to root_dir so cache.json is portable across checkouts
+        self.root_dir = str(root_dir) if root_dir else str(self.cache_file.parent)
+        # Framework files are keyed relative to the framework root instead, which usually
+        # lives outside the project (site-packages, a sibling checkout)
+        self.framework_dir = os.path.abspath(framework_dir) if framework_dir else None
+        self.cache, self.wheel_stamp, self.sha_cache = self._load_cache()
+        self._get = self.cache.get
+        # Digests computed by is_changed(), consumed by update_cache() so each file is hashed once
+        self._pending = {}
+
+    def _key(self, file_path):
+        path = os.path.abspath(file_path)
+        if self.framework_dir and path.startswith(self.framework_dir + os.sep):
+            return _FRAMEWORK_KEY_PREFIX + os.path.relpath(path, self.framework_dir)
+        try:
+            return os.path.relpath(path, self.root_dir)
+        except ValueError:
+            # On Windows a path on another drive has no relative form
+            return path
 
     def _load_cache(self):
         if self.cache_file.exists():
             try:
-                with open(self.cache_file, 'r') as f:
-                    return json.load(f)
+                with open(self.cache_file, 'rb') as f:
+                    data = f.read()
+                data = orjson.loads(data) if orjson else json.loads(data)
+                # Hashes are kept as raw digests in memory and hex-encoded only on disk
+                files = {path: bytes.fromhex(digest) for path, digest in data.get('files', {}).items()}
+                # sha_cache maps wheel arcname -> (mtime_ns, size, sha256 digest) of the staged file
+                sha_cache = {
+                    arcname: (mtime_ns, size, bytes.fromhex(digest))
+                    for arcname, (mtime_ns, size, digest) in data.get('wheel_files', {}).items()
+                }
+                # wheel_stamp identifies the wheel last packed from this cache state
+                return files, data.get('wheel'), sha_cache
             except Exception:
-                return {}
-        return {}
+                return {}, None, {}
+        return {}, None, {}
 
     def save(self):
         self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.cache_file, 'w') as f:
-            json.dump(self.cache, f, indent=2)
+        # Write to a temp file and rename over the real one so an interrupted build
+        # never leaves a truncated cache behind
+        tmp_file = self.cache_file.with_suffix('.json.tmp')
+        files = {path: digest.hex() for path, digest in self.cache.items()}
+        wheel_files = {
+            arcname: [mtime_ns, size, digest.hex()]
+            for arcname, (mtime_ns, size, digest) in self.sha_cache.items()
+        }
+        payload = {'files': files, 'wheel': self.wheel_stamp, 'wheel_files': wheel_files}
+        if orjson:
+            data = orjson.dumps(payload)
+        else:
+            data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        with open(tmp_file, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_file, self.cache_file)
 
     def get_hash(self, file_path):
         hasher = hashlib.md5()
         with open(file_path, 'rb') as f:
             buf = f.read()
             hasher.update(buf)
-        return hasher.hexdigest()
+        return hasher.digest()
 
     def is_changed(self, file_path):
-        file_path_str = str(file_path)
+        key = self._key(file_path)
         current_hash = self.get_hash(file_path)
-        cached_hash = self.cache.get(file_path_str)
+        self._pending[key] = current_hash
         
         # Debug why it thinks it changed
-        # if current_hash != cached_hash:
-        #     print(f"[DEBUG] Changed: {file_path.name} | Old: {cached_hash} | New: {current_hash}")
+        # if current_hash != self._get(key):
+        #     print(f"[DEBUG] Changed: {file_path.name} | Old: {self._get(key)} | New: {current_hash}")
         
-        return current_hash != cached_hash
+        return current_hash != self._get(key)
 
     def update_cache(self, file_path):
-        file_path_str = str(file_path)
-        self.cache[file_path_str] = self.get_hash(file_path)
+        # Callers update only after their output was written successfully, so the
+        # hash taken by is_changed() is recorded here rather than at check time
+        key = self._key(file_path)
+        current_hash = self._pending.pop(key, None)
+        if current_hash is None:
+            current_hash = self.get_hash(file_path)
+        self.cache[key] = current_hash
+
+    def is_known(self, file_path):
+        return self._key(file_path) in self.cache
 
 class MetaforBundler:
     def __init__(self, src_dir=".", out_dir="build", pyscript_toml=None, framework_dir=None, use_pyc=True):
@@ -57,7 +195,8 @@ class MetaforBundler:
         self.use_pyc = use_pyc
         self.generated_files = []
         self.setup_config = {}
-        self.cache = BuildCache(self.src_dir / ".metafor" / "cache.json")
+        self.cache = BuildCache(self.src_dir / ".metafor" / "cache.json", root_dir=self.src_dir,
+                                framework_dir=self.framework_dir)
 
         # Ensure framework is importable (for compiler)
         if self.framework_dir:
@@ -96,7 +235,23 @@ class MetaforBundler:
         except Exception as e:
             print(f"Error parsing setup.py: {e}")
 
-    def build(self):
+    def build(self, changed=None, is_watched=None):
+        # changed: optional set of source paths reported by the file watcher, and
+        # is_watched: the watcher's filter (path -> bool). A file the watcher covers
+        # but did not report, and that was built before, is not re-hashed; files it
+        # does not cover (other extensions, ignored dirs, the framework) always are.
+        # Only a completed build removes this marker. If it is still there the last
+        # build failed part-way (its cache was never saved), so stale files may lie
+        # outside this change set: fall back to re-hashing everything.
+        incomplete_marker = self.cache.cache_file.with_name('build.incomplete')
+        if changed is not None and incomplete_marker.exists():
+            changed = None
+        incomplete_marker.parent.mkdir(parents=True, exist_ok=True)
+        incomplete_marker.touch()
+
+        self._changed = {os.path.realpath(p) for p in changed} if changed is not None else None
+        self._is_watched = is_watched if changed is not None else None
+
         # Parse setup.py if it exists
         self._parse_setup_py()
 
@@ -117,6 +272,10 @@ class MetaforBundler:
         wheel_staging.mkdir(parents=True, exist_ok=True)
         # print(f"Staging exists? {wheel_staging.exists()}")
 
+        # Set whenever staging content is written or removed, so the wheel is only
+        # repacked when something actually changed
+        self._staging_changed = False
+
         # Copy framework to staging (only if framework changed or doesn't exist)
         if self.framework_dir and self.framework_dir.exists():
             framework_target = wheel_staging / self.framework_dir.name
@@ -138,6 +297,7 @@ class MetaforBundler:
             
             if framework_changed:
                 self._copy_framework(wheel_staging)
+                self._staging_changed = True
                 # Update cache for all framework files
                 for root, dirs, files in os.walk(self.framework_dir):
                     for file in files:
@@ -146,24 +306,34 @@ class MetaforBundler:
                             self.cache.update_cache(file_path)
 
         # Collect tasks for parallel execution
-        ptml_tasks = []
+        self._ptml_tasks = []
+
+        # Directories already ensured during this build (avoids a stat + mkdir per file)
+        self._created_dirs = set()
         
         # Track expected files in staging to cleanup deletions
         # Set of relative paths from staging root
-        expected_staging_files = set()
-        if self.framework_dir and self.framework_dir.exists():
-            # Add framework files to expected
-            framework_name = self.framework_dir.name
-            for root, dirs, files in os.walk(wheel_staging / framework_name):
-                # This is approximate, ideally we scan source structure.
-                # But framework is copied wholesale, so we assume it's valid if we just synced it.
-                # We can just ignore framework dir for pruning source files.
-                pass
+        # Keys are POSIX-style strings (e.g. "pages/home.py") built from the walk root, not Paths
+        self._expected_staging_files = set()
+        # Framework files are copied wholesale and skipped when pruning, so they are not tracked here
+
+        self._wheel_staging = wheel_staging
+        self._sass_enabled = self.setup_config.get('sass_processor_enabled', False)
+
+        # Dispatch on file suffix; anything else is a plain asset
+        suffix_handlers = {
+            '.ptml': self._stage_ptml,
+            '.py': self._stage_py,
+            '.scss': self._build_sass,
+            '.sass': self._build_sass,
+        }
+        excluded_dirs = {self.out_dir.name, 'build', 'public'}
         
         # Walk through source directory
         for root, dirs, files in os.walk(self.src_dir):
             # Skip build directory and hidden directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d != self.out_dir.name and d != 'build' and d != 'public']
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in excluded_dirs]
+            rel_prefix = _rel_prefix(root, self.src_dir)
             
             for file in files:
                 if file.startswith('.'): continue
@@ -172,74 +342,16 @@ class MetaforBundler:
                 rel_path = file_path.relative_to(self.src_dir)
                 
                 # Exclude specific files from processing
-                if file == 'pyscript.toml' or file == 'index.html' or file == 'build.py' or file.startswith('build_') or file == 'main.py' or file == 'setup.py':
-                    if file == 'index.html' or file == 'pyscript.toml' or file == 'main.py':
+                if file in EXCLUDED_FILES or file.startswith('build_'):
+                    if file in COPY_TO_OUT:
                          target_file = self.out_dir / rel_path
-                         if self.cache.is_changed(file_path) or not target_file.exists():
-                             shutil.copy2(file_path, target_file)
+                         if self._needs_update(file_path, target_file):
+                             _fast_copy(file_path, target_file)
                              self.cache.update_cache(file_path)
                     continue
                 
-                # Determine target: wheel staging for code, build dir for assets
-                if file.endswith('.ptml') or file.endswith('.py'):
-                    # Code goes to wheel staging
-                    target_dir = wheel_staging / rel_path.parent
-                    if not target_dir.exists(): target_dir.mkdir(parents=True)
-                    
-                    if file.endswith('.ptml'):
-                        target_filename = file_path.with_suffix('.py').name
-                        target_file = target_dir / target_filename
-                        expected_staging_files.add(str((target_dir / target_filename).relative_to(wheel_staging)))
-                        
-                        if self.cache.is_changed(file_path) or not target_file.exists():
-                            ptml_tasks.append((file_path, target_dir))
-                    else:
-                        if not file.startswith('test_'):
-                             target_file = target_dir / file
-                             expected_staging_files.add(str((target_dir / file).relative_to(wheel_staging)))
-                             
-                             if self.cache.is_changed(file_path) or not target_file.exists():
-                                 shutil.copy2(file_path, target_dir)
-                                 self.cache.update_cache(file_path)
-                else:
-                    # Assets go to build dir
-                    target_dir = self.out_dir / rel_path.parent
-                    if not target_dir.exists(): target_dir.mkdir(parents=True)
-                    
-                    is_sass = file.endswith('.scss') or file.endswith('.sass')
-                    sass_enabled = self.setup_config.get('sass_processor_enabled', False)
-
-                    if is_sass and sass_enabled:
-                        target_filename = file_path.with_suffix('.css').name
-                        target_file = target_dir / target_filename
-                        
-                        if self.cache.is_changed(file_path) or not target_file.exists():
-                            try:
-                                import sass
-                                with open(file_path, 'r') as f:
-                                    scss_content = f.read()
-                                css_content = sass.compile(string=scss_content)
-                                with open(target_file, 'w') as f:
-                                    f.write(css_content)
-                                self.cache.update_cache(file_path)
-                                print(f"  → Compiled {rel_path} to CSS")
-                            except ImportError:
-                                print("Warning: libsass not installed. Skipping Sass compilation.")
-                            except Exception as e:
-                                print(f"Error compiling {rel_path}: {e}")
-                                
-                        # Track assets for [files] section
-                        rel_to_out = target_file.relative_to(self.out_dir)
-                        self.generated_files.append(rel_to_out)
-                    else:
-                        target_file = target_dir / file
-                        if self.cache.is_changed(file_path) or not target_file.exists():
-                            shutil.copy2(file_path, target_dir)
-                            self.cache.update_cache(file_path)
-                        
-                        # Track assets for [files] section
-                        rel_to_out = target_file.relative_to(self.out_dir)
-                        self.generated_files.append(rel_to_out)
+                # Code goes to wheel staging, assets go to build dir
+                suffix_handlers.get(file_path.suffix, self._copy_asset)(file_path, rel_path, rel_prefix)
 
         # Prune deleted files from staging
         # We only prune files that match patterns we manage (.py) and are not in framework
@@ -247,32 +359,23 @@ class MetaforBundler:
         framework_prefix = self.framework_dir.name if (self.framework_dir and self.framework_dir.exists()) else "___nonexistent___"
         
         for root, dirs, files in os.walk(wheel_staging):
-             rel_root = pathlib.Path(root).relative_to(wheel_staging)
-             if str(rel_root).startswith(framework_prefix):
+             rel_prefix = _rel_prefix(root, wheel_staging)
+             if rel_prefix.startswith(framework_prefix):
                  continue
                  
              for file in files:
                  if file.endswith('.py'):
-                     rel_file = rel_root / file
-                     if str(rel_file) not in expected_staging_files:
+                     rel_file = rel_prefix + file
+                     if rel_file not in self._expected_staging_files:
                          # File was deleted from source
                          # print(f"Pruning deleted file: {rel_file}")
                          os.remove(pathlib.Path(root) / file)
+                         self._staging_changed = True
 
-        if ptml_tasks:
-            print(f"Compiling {len(ptml_tasks)} PTML file(s)...")
-            # Use ThreadPoolExecutor instead of ProcessPool to avoid process spawn overhead/zombies
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                futures = [executor.submit(self._compile_ptml_task, task) for task in ptml_tasks]
-                for future in concurrent.futures.as_completed(futures):
-                    try:
-                        file_path = future.result()
-                        rel_path = file_path.relative_to(self.src_dir)
-                        print(f"  → Compiled {rel_path}")
-                        self.cache.update_cache(file_path)
-                    except Exception as e:
-                        print(f"Compilation failed: {e}")
-                        raise e
+        if self._ptml_tasks:
+            print(f"Compiling {len(self._ptml_tasks)} PTML file(s)...")
+            self._compile_ptml_batch(self._ptml_tasks)
+            self._staging_changed = True
         else:
             # print("No PTML files to compile (all up to date)")
             pass
@@ -288,48 +391,30 @@ class MetaforBundler:
              except Exception as e:
                  print(f"Error during parallel pyc compilation: {e}")
 
-        # Create Wheel from staging
-        # We COPY staging to a temp build dir because _create_wheel is destructive (pyc compilation)
-        # Use a unique directory to avoid shutil.copytree race conditions/errors
-        timestamp = int(time.time() * 1000)
-        wheel_build_dir = self.out_dir / f"_wheel_build_tmp_{timestamp}"
-        
-        if wheel_build_dir.exists(): shutil.rmtree(wheel_build_dir)
-        shutil.copytree(wheel_staging, wheel_build_dir)
-
         wheel_filename = f"{self.setup_config.get('name', 'metafor_app')}-{self.setup_config.get('version', '0.1.0')}-py3-none-any.whl"
         wheel_path = public_dir / wheel_filename
         
         # Check if wheel needs rebuilding
-        # Since we synced staging, any change there implies we need a new wheel
-        # Or if previous wheel is missing
-        needs_wheel_rebuild = not wheel_path.exists()
-        
-        # Optimization: We could track if we actually copied/compiled anything above.
-        # But we also need to check if existing wheel is older than staging (in case of interrupted build)
-        if not needs_wheel_rebuild:
-            # Check mtimes
-             wheel_mtime = wheel_path.stat().st_mtime
-             for root, dirs, files in os.walk(wheel_build_dir):
-                for file in files:
-                    file_path = pathlib.Path(root) / file
-                    if file_path.stat().st_mtime > wheel_mtime:
-                        needs_wheel_rebuild = True
-                        break
-                if needs_wheel_rebuild: break
+        # Any write to staging above implies we need a new wheel, as does a missing
+        # wheel or a different wheel name / output type than the one last packed
+        wheel_stamp = f"{wheel_filename}:{'pyc' if self.use_pyc else 'py'}"
+        needs_wheel_rebuild = (
+            self._staging_changed
+            or not wheel_path.exists()
+            or self.cache.wheel_stamp != wheel_stamp
+        )
         
         if needs_wheel_rebuild:
             # DIRECT WHEEL GENERATION (No temp dir, no subprocess)
             self._pack_wheel(wheel_staging, wheel_path)
+            self.cache.wheel_stamp = wheel_stamp
             print(f"Wheel created in {public_dir}")
         else:
             print(f"Wheel up to date.")
         
-        # Cleanup TEMP build dir, but KEEP staging
-        shutil.rmtree(wheel_build_dir)
-        
         # Save cache
         self.cache.save()
+        incomplete_marker.unlink(missing_ok=True)
 
         # Update pyscript.toml
         if self.pyscript_toml:
@@ -341,18 +426,132 @@ class MetaforBundler:
         # Print summary
         print("\033[92m✓ Build complete\033[0m")
 
+    def _stage_ptml(self, file_path, rel_path, rel_prefix):
+        target_dir = self._wheel_staging / rel_path.parent
+        self._ensure_dir(target_dir)
+
+        target_filename = file_path.with_suffix('.py').name
+        target_file = target_dir / target_filename
+        self._expected_staging_files.add(rel_prefix + target_filename)
+
+        if self._needs_update(file_path, target_file):
+            self._ptml_tasks.append((file_path, target_dir))
+
+    def _stage_py(self, file_path, rel_path, rel_prefix):
+        if file_path.name.startswith('test_'):
+            return
+        target_dir = self._wheel_staging / rel_path.parent
+        self._ensure_dir(target_dir)
+
+        target_file = target_dir / file_path.name
+        self._expected_staging_files.add(rel_prefix + file_path.name)
+
+        if self._needs_update(file_path, target_file):
+            _fast_copy(file_path, target_file)
+            self.cache.update_cache(file_path)
+            self._staging_changed = True
+
+    def _build_sass(self, file_path, rel_path, rel_prefix):
+        if not self._sass_enabled:
+            self._copy_asset(file_path, rel_path, rel_prefix)
+            return
+        target_dir = self.out_dir / rel_path.parent
+        self._ensure_dir(target_dir)
+
+        target_filename = file_path.with_suffix('.css').name
+        target_file = target_dir / target_filename
+
+        if self._needs_update(file_path, target_file):
+            try:
+                import sass
+                with open(file_path, 'r') as f:
+                    scss_content = f.read()
+                css_content = sass.compile(string=scss_content)
+                with open(target_file, 'w') as f:
+                    f.write(css_content)
+                self.cache.update_cache(file_path)
+                print(f"  → Compiled {rel_path} to CSS")
+            except ImportError:
+                print("Warning: libsass not installed. Skipping Sass compilation.")
+            except Exception as e:
+                print(f"Error compiling {rel_path}: {e}")
+
+        # Track assets for [files] section
+        self.generated_files.append(target_file.relative_to(self.out_dir))
+
+    def _copy_asset(self, file_path, rel_path, rel_prefix):
+        target_dir = self.out_dir / rel_path.parent
+        self._ensure_dir(target_dir)
+
+        target_file = target_dir / file_path.name
+        if self._needs_update(file_path, target_file):
+            _fast_copy(file_path, target_file)
+            self.cache.update_cache(file_path)
+
+        # Track assets for [files] section
+        self.generated_files.append(target_file.relative_to(self.out_dir))
+
+    def _needs_update(self, file_path, target_file):
+        # A watched file the watcher did not report is unchanged; trust its cached build
+        if self._is_watched is not None:
+            path = str(file_path)
+            if (path not in self._changed and self._is_watched(path)
+                    and self.cache.is_known(file_path) and target_file.exists()):
+                return False
+        return self.cache.is_changed(file_path) or not target_file.exists()
+
+    def _ensure_dir(self, target_dir):
+        if target_dir not in self._created_dirs:
+            target_dir.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(target_dir)
+
+    def _compile_ptml_batch(self, ptml_tasks):
+        # Read sources here so workers only do the CPU-bound parse + codegen
+        jobs = []
+        for file_path, target_dir in ptml_tasks:
+            with open(file_path, 'r') as f:
+                jobs.append((file_path, target_dir, f.read()))
+
+        # Compilation is pure Python, so threads serialize on the GIL. Use the
+        # process pool when there is enough work to amortize it, threads otherwise.
+        if _USE_PROCESS_POOL and len(jobs) >= _PROCESS_POOL_MIN_TASKS:
+            executor = _get_compile_ptml_pool()
+            owns_executor = False
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor()
+            owns_executor = True
+
+        try:
+            futures = {
+                executor.submit(_compile_ptml_source, source, str(file_path)): (file_path, target_dir)
+                for file_path, target_dir, source in jobs
+            }
+            for future in concurrent.futures.as_completed(futures):
+                file_path, target_dir = futures[future]
+                try:
+                    compiled_code = future.result()
+                except Exception as e:
+                    print(f"Error compiling {file_path}: {e}")
+                    raise e
+
+                target_file = target_dir / file_path.with_suffix('.py').name
+                with open(target_file, 'w') as f:
+                    f.write(compiled_code)
+                rel_path = file_path.relative_to(self.src_dir)
+                print(f"  → Compiled {rel_path}")
+                self.cache.update_cache(file_path)
+        finally:
+            if owns_executor:
+                executor.shutdown()
+
     def _compile_ptml_task(self, task):
         file_path, target_dir = task
-        # print statement removed to avoid subprocess stdout issues
         try:
             with open(file_path, 'r') as f:
                 source = f.read()
-            
-            from metafor.compiler import MetaforCompiler
-            compiler = MetaforCompiler()
-            filename = str(file_path)
-            compiled_code = compiler.compile(source, filename=filename)
-            
+
+            compiled_code = _compile_ptml_source(source, str(file_path))
+
             target_filename = file_path.with_suffix('.py').name
             target_file = target_dir / target_filename
             with open(target_file, 'w') as f:
@@ -386,23 +585,37 @@ class MetaforBundler:
         version = self.setup_config.get('version', '0.1.0')
         dist_info_dir = f"{safe_name}-{version}.dist-info"
         
-        with zipfile.ZipFile(wheel_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        # Pack into a temp file and rename it into place, so an interrupted build
+        # never leaves a truncated wheel that looks up to date
+        tmp_wheel_path = wheel_path.with_suffix('.whl.tmp')
+        with zipfile.ZipFile(tmp_wheel_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
             record_rows = []
+            sha_cache = self.cache.sha_cache
+            # Rebuilt from scratch so files no longer in the wheel drop out of the cache
+            new_sha_cache = {}
             
             def add_file(path, arcname):
                 # print(f"  Adding {arcname}")
-                # Stream content to both Zip and Hasher in one pass
-                hasher = hashlib.sha256()
-                size = 0
+                st = os.stat(path)
+                cached = sha_cache.get(arcname)
                 
                 # zf.open returns a file-like object we can write to
                 with open(path, 'rb') as src, zf.open(arcname, 'w') as dst:
-                    while chunk := src.read(64 * 1024): # 64k chunks
-                        size += len(chunk)
-                        hasher.update(chunk)
-                        dst.write(chunk)
+                    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                        # Unchanged since the last pack: reuse its digest, only copy the bytes
+                        shutil.copyfileobj(src, dst, 64 * 1024)
+                        size, digest = st.st_size, cached[2]
+                    else:
+                        # Stream content to both Zip and Hasher in one pass
+                        hasher = hashlib.sha256()
+                        size = 0
+                        while chunk := src.read(64 * 1024): # 64k chunks
+                            size += len(chunk)
+                            hasher.update(chunk)
+                            dst.write(chunk)
+                        digest = hasher.digest()
                 
-                digest = hasher.digest()
+                new_sha_cache[arcname] = (st.st_mtime_ns, size, digest)
                 hash_str = base64.urlsafe_b64encode(digest).decode('ascii').rstrip('=')
                 record_rows.append(f"{arcname},sha256={hash_str},{size}")
 
@@ -464,40 +677,38 @@ Tag: py3-none-any
             record_content = "\n".join(record_rows) + "\n"
             zf.writestr(f"{dist_info_dir}/RECORD", record_content)
 
+        os.replace(tmp_wheel_path, wheel_path)
+        self.cache.sha_cache = new_sha_cache
+
 
     def _update_pyscript_toml(self, toml_path):
         # print(f"Updating {toml_path}...")
         import tomllib
-
-        # Read existing packages from the SOURCE TOML file using tomllib
-        user_packages = []
         try:
-            # self.pyscript_toml is the source file
+            import tomli_w
+        except ImportError as e:
+            # A metafor-cli dependency, but dev scripts may build from a bare checkout
+            raise ImportError(
+                "Updating pyscript.toml needs the 'tomli-w' package (pip install tomli-w)"
+            ) from e
+
+        # Always start from the SOURCE TOML file: the copy in out_dir may already
+        # contain entries injected by a previous build
+        try:
             with open(self.pyscript_toml, "rb") as f:
                 data = tomllib.load(f)
-                user_packages = data.get("packages", [])
-                user_files = data.get("files", {})
         except Exception as e:
-            print(f"Warning: Could not parse {self.pyscript_toml} to read existing packages: {e}")
+            print(f"Warning: Could not parse {self.pyscript_toml}, leaving {toml_path} unchanged: {e}")
+            return
 
-        with open(toml_path, 'r') as f:
-            lines = f.readlines()
-            
-        new_lines = []
-        in_files = False
-        in_packages = False
-        
         # We need to inject our wheel into packages
         # And assets into files
-        
         wheel_filename = f"{self.setup_config.get('name', 'metafor_app')}-{self.setup_config.get('version', '0.1.0')}-py3-none-any.whl"
         wheel_path = f"./public/{wheel_filename}"
         
-        packages_found = False
-        files_found = False
-        
         # Get dependencies from setup config
         dependencies = self.setup_config.get('install_requires', [])
+        user_packages = data.get("packages", [])
         
         # Combine dependencies: wheel + install_requires + user_packages
         # Use a set to avoid duplicates, but preserve order roughly
@@ -514,60 +725,14 @@ Tag: py3-none-any
                 all_packages.append(pkg)
                 seen.add(pkg)
 
-        for line in lines:
-            stripped = line.strip()
-            
-            # Handle [packages]
-            if stripped.startswith('packages'):
-                in_packages = True
-                packages_found = True
-                new_lines.append("packages = [\n")
-                for pkg in all_packages:
-                    new_lines.append(f'    "{pkg}",\n')
-                new_lines.append("]\n")
-                continue
-            
-            if in_packages:
-                if stripped.endswith(']'):
-                    in_packages = False
-                continue
-
-            # Handle [files]
-            if stripped.startswith('[files]'):
-                in_files = True
-                files_found = True
-                new_lines.append(line)
-                
-                # Merge files: generated first, then user overrides
-                merged_files = {}
-                for gen_file in self.generated_files:
-                    vfs_path = str(gen_file)
-                    real_path = f"./{gen_file}"
-                    merged_files[vfs_path] = real_path
-                
-                # Update with user files
-                merged_files.update(user_files)
-                
-                for vfs, real in merged_files.items():
-                    new_lines.append(f'"{vfs}" = "{real}"\n')
-                continue
-            
-            if in_files and stripped.startswith('['):
-                in_files = False
-                
-            if not in_files:
-                new_lines.append(line)
-        
-        if not packages_found:
-             pkg_str = ", ".join([f'"{p}"' for p in all_packages])
-             new_lines.insert(0, f'packages = [{pkg_str}]\n\n')
-             
-        if not files_found and self.generated_files:
-            new_lines.append("\n[files]\n")
-            for gen_file in self.generated_files:
-                vfs_path = str(gen_file)
-                real_path = f"./{gen_file}"
-                new_lines.append(f'"{vfs_path}" = "{real_path}"\n')
-
-        with open(toml_path, 'w') as f:
-            f.writelines(new_lines)
+        data["packages"] = all_packages
+
+        # Merge files: generated first, then user overrides
+        user_files = data.get("files", {})
+        if user_files or self.generated_files:
+            merged_files = {str(gen_file): f"./{gen_file}" for gen_file in self.generated_files}
+            merged_files.update(user_files)
+            data["files"] = merged_files
+
+        with open(toml_path, 'wb') as f:
+            tomli_w.dump(data, f)
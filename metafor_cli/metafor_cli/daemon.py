@@ -0,0 +1,284 @@
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+# Shared file-watcher daemon for `metafor serve --daemon`.
+#
+# One daemon per user holds a single watchdog Observer; every serve process connects
+# over a UNIX socket, asks for the directories it wants watched and gets the raw
+# events streamed back. Projects served by several processes share one inotify
+# subscription per directory, and there is one watcher thread in total.
+#
+# Wire format, one tab-separated line per message:
+#   client -> daemon:  watch <id> <recursive 0|1> <path>
+#   daemon -> client:  <id> <event_type> <is_directory 0|1> <src_path> <dest_path>
+
+SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".metafor", "watcher.sock")
+# Seconds the daemon lingers with no connected serve process before exiting
+IDLE_TIMEOUT = 60
+
+_FORWARDED_EVENTS = ('modified', 'created', 'deleted', 'moved')
+
+
+def is_supported():
+    return hasattr(socket, 'AF_UNIX')
+
+
+def _connect():
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(SOCKET_PATH)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def connect(timeout=5.0):
+    # Reuse a running daemon, or start one detached from this process and wait for it
+    try:
+        return _connect()
+    except OSError:
+        pass
+
+    os.makedirs(os.path.dirname(SOCKET_PATH), exist_ok=True)
+    # The child gets this process's import path, so metafor_cli and watchdog resolve the
+    # same way even when they are not on the interpreter's default path (dev checkouts)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "metafor_cli.daemon"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return _connect()
+        except OSError:
+            # A daemon that exited with an error (e.g. an import failure) will never
+            # listen; exit status 0 means another daemon won the race to start
+            if proc.poll() or time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+class _Event:
+    # Just enough of watchdog's FileSystemEvent for the serve handler
+    __slots__ = ('event_type', 'is_directory', 'src_path', 'dest_path')
+
+    def __init__(self, event_type, is_directory, src_path, dest_path):
+        self.event_type = event_type
+        self.is_directory = is_directory
+        self.src_path = src_path
+        self.dest_path = dest_path
+
+
+class DaemonObserver:
+    # Drop-in for watchdog's Observer (schedule/start/stop/join) backed by the daemon.
+    # on_reconnect is called after the connection was lost and re-established: events
+    # from the outage are gone, so the caller should rescan (rebuild) in full.
+    def __init__(self, on_reconnect=None):
+        self._sock = connect()
+        self._on_reconnect = on_reconnect
+        self._handlers = {}
+        # Wire messages for every scheduled watch, replayed after a reconnect
+        self._watch_messages = []
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def schedule(self, event_handler, path, recursive=False):
+        with self._lock:
+            watch_id = str(len(self._handlers))
+            self._handlers[watch_id] = event_handler
+            message = f"watch\t{watch_id}\t{int(recursive)}\t{path}\n".encode('utf-8')
+            self._watch_messages.append(message)
+            self._sock.sendall(message)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            sock = self._sock
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            self._read_events()
+            if self._stopped:
+                return
+            # The daemon went away (killed or crashed); start a new one and re-send the watches
+            print("Lost connection to watcher daemon; reconnecting...")
+            try:
+                self._reconnect()
+            except OSError as e:
+                print(f"Could not reconnect to watcher daemon ({e}); file changes are no longer detected")
+                return
+            if self._on_reconnect is not None and not self._stopped:
+                self._on_reconnect()
+
+    def _read_events(self):
+        with self._sock.makefile('r', encoding='utf-8', errors='replace', newline='\n') as reader:
+            try:
+                for line in reader:
+                    try:
+                        watch_id, event_type, is_dir, src_path, dest_path = line.rstrip('\n').split('\t')
+                    except ValueError:
+                        # A malformed line is dropped; it must not end the stream
+                        continue
+                    handler = self._handlers.get(watch_id)
+                    if handler is not None:
+                        event = _Event(event_type, is_dir == '1', src_path, dest_path)
+                        getattr(handler, 'on_' + event_type)(event)
+            except OSError:
+                pass
+
+    def _reconnect(self):
+        sock = connect()
+        with self._lock:
+            if self._stopped:
+                sock.close()
+                return
+            self._sock.close()
+            self._sock = sock
+            for message in self._watch_messages:
+                sock.sendall(message)
+
+
+class _Forwarder(FileSystemEventHandler):
+    # One per scheduled (path, recursive) watch; fans its events out to every
+    # (client, watch id) subscribed to it
+    def __init__(self):
+        self.subscribers = set()
+
+    def on_any_event(self, event):
+        if event.event_type not in _FORWARDED_EVENTS:
+            return
+        dest_path = getattr(event, 'dest_path', '') or ''
+        tail = f"{event.event_type}\t{int(event.is_directory)}\t{event.src_path}\t{dest_path}\n"
+        for client, watch_id in list(self.subscribers):
+            client.send_line(f"{watch_id}\t{tail}")
+
+
+class _WatcherServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path):
+        super().__init__(path, _ClientHandler)
+        self.observer = Observer()
+        self.observer.start()
+        self.lock = threading.Lock()
+        # (path, recursive) -> (ObservedWatch, Forwarder)
+        self.watches = {}
+        self.clients = 0
+        self.idle_since = time.monotonic()
+
+    def subscribe(self, client, watch_id, path, recursive):
+        key = (path, recursive)
+        with self.lock:
+            entry = self.watches.get(key)
+            if entry is None:
+                forwarder = _Forwarder()
+                entry = (self.observer.schedule(forwarder, path, recursive=recursive), forwarder)
+                self.watches[key] = entry
+            entry[1].subscribers.add((client, watch_id))
+
+    def unsubscribe_all(self, client):
+        with self.lock:
+            for key, (watch, forwarder) in list(self.watches.items()):
+                forwarder.subscribers = {sub for sub in forwarder.subscribers if sub[0] is not client}
+                if not forwarder.subscribers:
+                    self.observer.unschedule(watch)
+                    del self.watches[key]
+
+    def is_idle(self):
+        with self.lock:
+            return self.clients == 0 and time.monotonic() - self.idle_since > IDLE_TIMEOUT
+
+
+class _ClientHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self._write_lock = threading.Lock()
+        with self.server.lock:
+            self.server.clients += 1
+
+    def send_line(self, line):
+        with self._write_lock:
+            try:
+                self.connection.sendall(line.encode('utf-8'))
+            except OSError:
+                # The reader side notices the disconnect and cleans up
+                pass
+
+    def handle(self):
+        for raw in self.rfile:
+            try:
+                command, watch_id, recursive, path = raw.decode('utf-8').rstrip('\n').split('\t')
+            except ValueError:
+                continue
+            if command == 'watch' and os.path.isdir(path):
+                self.server.subscribe(self, watch_id, path, recursive == '1')
+
+    def finish(self):
+        self.server.unsubscribe_all(self)
+        with self.server.lock:
+            self.server.clients -= 1
+            if self.server.clients == 0:
+                self.server.idle_since = time.monotonic()
+        super().finish()
+
+
+def main():
+    # Another daemon may have won the race to start; leave it be
+    try:
+        _connect().close()
+        return
+    except OSError:
+        pass
+    try:
+        os.unlink(SOCKET_PATH)
+    except FileNotFoundError:
+        pass
+
+    server = _WatcherServer(SOCKET_PATH)
+
+    def exit_when_idle():
+        while not server.is_idle():
+            time.sleep(5)
+        server.shutdown()
+
+    threading.Thread(target=exit_when_idle, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.observer.stop()
+        server.observer.join()
+        server.server_close()
+        try:
+            os.unlink(SOCKET_PATH)
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    main()
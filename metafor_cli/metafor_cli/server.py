@@ -1,23 +1,242 @@
 
 import os
+import re
+import selectors
+import socket
+import stat
 import sys
 import threading
 import time
 from http import server
 from .builder import build_project
 
-def run_server(host, port):
+WATCH_EXTENSIONS = frozenset({'.py', '.ptml', '.js', '.jsx', '.css', '.html', '.toml', '.scss', '.sass'})
+IGNORE_DIRS = frozenset({'build', '__pycache__', '.git', '.idea', '.vscode', 'node_modules'})
+
+# Matches a path containing any IGNORE_DIRS entry as a whole component, in one scan
+_SEP = re.escape(os.sep)
+_IGNORE_RE = re.compile(r'(?:^|%s)(?:%s)(?:%s|$)' % (_SEP, '|'.join(map(re.escape, sorted(IGNORE_DIRS))), _SEP))
+
+
+def _collect_derived_pys(root):
+    # .py paths that would be generated from a sibling .ptml; events for these are
+    # build by-products, so the handler drops them without probing the filesystem
+    derived = []
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in IGNORE_DIRS and not name.startswith('.') and not name.endswith('.egg-info'):
+                        stack.append(entry.path)
+                elif name.endswith('.ptml'):
+                    derived.append(entry.path[:-5] + '.py')
+    return frozenset(derived)
+
+def _is_watched_path(path, watch_dir, derived_pys):
+    # The watcher's filter, also handed to the bundler: it may only skip re-hashing
+    # files this function accepts, since events for anything else are dropped
+    # Strict Ignoring
+    # Check for ignored directories in path, relative to the project so a
+    # parent directory named e.g. "build" does not hide every event
+    # We must explicitly ignore .egg-info here too, as it was the cause of the loop
+    rel_path = path[len(watch_dir):] if path.startswith(watch_dir) else path
+    if _IGNORE_RE.search(rel_path) or '.egg-info' in rel_path:
+        return False
+
+    # Check for interesting extensions
+    ext = path[path.rfind('.'):]
+    if ext not in WATCH_EXTENSIONS:
+        return False
+
+    # Ignore .py files if they are derived from .ptml
+    return not (ext == '.py' and path in derived_pys)
+
+# Injected right before </body> in served HTML pages
+_LIVE_RELOAD_SCRIPT = b"""
+<script>
+(function() {
+    const evtSource = new EventSource("/_metafor/events");
+    evtSource.onmessage = function(event) {
+        if (event.data === "reload") {
+            console.log("Reload signal received, reloading...");
+            window.location.reload();
+        }
+    };
+    evtSource.onerror = function(err) {
+        // EventSource errors are expected during development (connection interruptions)
+        // These are harmless and don't affect the app functionality
+    };
+})();
+</script>
+"""
+
+# Injected pages keyed by (path, st_mtime_ns, st_size); cleared after every rebuild.
+# A plain dict rather than thread-local storage: the threading server uses a fresh
+# thread per request, so per-thread caches would never be hit.
+_INJECT_CACHE = {}
+
+def _inject_reload_script(local_path):
+    # Pages are small and always read whole: one unbuffered read of the exact size
+    # (no BufferedReader chunking), then join head + script + tail in one allocation
+    # rather than copying the page and then rescanning it with replace()
+    fd = os.open(local_path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, size, os.POSIX_FADV_SEQUENTIAL)
+        page = os.read(fd, size)
+        # A regular file normally comes back in one read; keep going if it did not
+        while len(page) < size:
+            chunk = os.read(fd, size - len(page))
+            if not chunk:
+                break
+            page += chunk
+    finally:
+        os.close(fd)
+
+    idx = page.rfind(b'</body>')
+    if idx == -1:
+        return page
+    with memoryview(page) as view:
+        return b''.join((view[:idx], _LIVE_RELOAD_SCRIPT, view[idx:]))
+
+# Pre-encoded no-cache headers appended to every response
+_NOCACHE_HEADER_BLOB = (
+    b"Cache-Control: no-store, no-cache, must-revalidate\r\n"
+    b"Pragma: no-cache\r\n"
+    b"Expires: 0\r\n"
+)
+
+# ANSI-colored status codes for the request log, built once per code
+_CODE_COLORS = {}
+
+def _colored_code(code):
+    colored = _CODE_COLORS.get(code)
+    if colored is None:
+        if 200 <= code < 300:
+            colored = f"\033[92m{code}\033[0m"
+        elif 400 <= code < 500:
+            # Orange for Client Errors
+            colored = f"\033[38;5;208m{code}\033[0m"
+        elif code >= 500:
+            # Red for Server Errors
+            colored = f"\033[91m{code}\033[0m"
+        else:
+            colored = str(code)
+        _CODE_COLORS[code] = colored
+    return colored
+
+class _SSEClients:
+    # Parks live-reload EventSource connections on one selector thread instead of
+    # keeping a server thread blocked per open browser tab
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._sockets = set()
+        self._thread = None
+        self._message = None
+        # Self-pipe: broadcast() writes a byte so the selector thread wakes immediately
+        # and does the sending itself. A socketpair rather than os.pipe() because
+        # select() on Windows only accepts sockets.
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+
+    def owns(self, sock):
+        with self._lock:
+            return sock in self._sockets
+
+    def add(self, sock):
+        sock.setblocking(False)
+        with self._lock:
+            self._sockets.add(sock)
+            # Readable only when the client disconnects (EventSource never sends a body)
+            self._selector.register(sock, selectors.EVENT_READ)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        # Not every selector picks up registrations made during a select(); wake it
+        self._wake()
+
+    def broadcast(self, message):
+        with self._lock:
+            if not self._sockets:
+                return
+            self._message = message
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'x')
+        except OSError:
+            # Buffer full: a wake-up is already pending
+            pass
+
+    def _discard(self, sock):
+        with self._lock:
+            if sock not in self._sockets:
+                return
+            self._sockets.discard(sock)
+            self._selector.unregister(sock)
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+    def _send_all(self, message):
+        with self._lock:
+            sockets = list(self._sockets)
+        for sock in sockets:
+            try:
+                sock.send(message)
+            except OSError:
+                pass
+            # One event per connection: the browser reloads and opens a new stream
+            self._discard(sock)
+
+    def _run(self):
+        # Blocks in select() with no timeout; idle tabs cost nothing until a build or disconnect
+        while True:
+            for key, _ in self._selector.select():
+                sock = key.fileobj
+                if sock is self._wake_r:
+                    try:
+                        while sock.recv(4096):
+                            pass
+                    except OSError:
+                        pass
+                    with self._lock:
+                        message, self._message = self._message, None
+                    if message:
+                        self._send_all(message)
+                    continue
+                try:
+                    data = sock.recv(1024)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    data = b''
+                if not data:
+                    self._discard(sock)
+
+def run_server(host, port, use_daemon=False):
     project_path = os.getcwd()
     
     # Start watcher in a separate thread
-    WATCH_EXTENSIONS = {'.py', '.ptml', '.js', '.jsx', '.css', '.html', '.toml', '.scss', '.sass'}
-    IGNORE_DIRS = {'build', '__pycache__', '.git', '.idea', '.vscode', 'node_modules'}
     WATCH_DIR = project_path
     
     # Global variable to track build time
-    state = {'last_build_time': time.time()}
-    # Condition to notify waiting clients
-    build_condition = threading.Condition()
+    state = {'last_build_time': time.time(), 'derived_pys': _collect_derived_pys(WATCH_DIR)}
+    # Open live-reload connections, notified after each successful build
+    sse_clients = _SSEClients()
 
     from watchdog.observers import Observer
     from watchdog.events import FileSystemEventHandler
@@ -28,6 +247,13 @@ def run_server(host, port):
             self.callback = callback
             self.debounce_interval = debounce_interval
             self.timer = None
+            # Paths seen since the last build; handed to the callback as one change set
+            self._pending = set()
+            # Set when events may have been missed; the next build gets no change set
+            self._full_build = False
+            self._lock = threading.Lock()
+            # Set by start_watcher so new top-level directories can be watched too
+            self.observer = None
             
         def _trigger_build(self):
             if self.timer:
@@ -36,47 +262,101 @@ def run_server(host, port):
             self.timer.start()
             
         def _execute_build(self):
-            self.callback()
+            with self._lock:
+                pending, self._pending = self._pending, set()
+                if self._full_build:
+                    pending, self._full_build = None, False
+            self.callback(pending)
+
+        def request_full_build(self):
+            # The watcher lost events (daemon reconnect), so rebuild with a full hash pass
+            with self._lock:
+                self._full_build = True
+            self._trigger_build()
             
-        def on_any_event(self, event):
+        # Only content-changing events are handled. on_any_event would also see the
+        # opened/closed events the build itself produces when reading sources.
+        def on_modified(self, event):
+            if not event.is_directory:
+                self._handle_path(event.src_path)
+
+        def on_created(self, event):
             if event.is_directory:
-                return
+                self._watch_new_root_dir(event.src_path)
+            else:
+                self._handle_path(event.src_path)
 
-            # Strict Ignoring
-            path = event.src_path
-            # Check for ignored directories in path
-            # We must explicitly ignore .egg-info here too, as it was the cause of the loop
-            if any(part in path.split(os.sep) for part in IGNORE_DIRS) or '.egg-info' in path:
+        def on_deleted(self, event):
+            if not event.is_directory:
+                self._handle_path(event.src_path)
+
+        def on_moved(self, event):
+            if event.is_directory:
+                self._watch_new_root_dir(event.dest_path)
+            else:
+                # Editors often save via write-to-temp + rename; the destination is what matters
+                self._handle_path(event.dest_path)
+
+        def _watch_new_root_dir(self, path):
+            if self.observer and os.path.dirname(path) == WATCH_DIR and _is_watched_root(os.path.basename(path)):
+                self.observer.schedule(self, path, recursive=True)
+
+        def _handle_path(self, path):
+            if not _is_watched_path(path, WATCH_DIR, state['derived_pys']):
                 return
             
-            # Check for interesting extensions
-            ext = os.path.splitext(path)[1]
-            if ext in WATCH_EXTENSIONS:
-                # Ignore .py files if they are derived from .ptml
-                if ext == '.py':
-                     ptml_path = os.path.splitext(path)[0] + '.ptml'
-                     if os.path.exists(ptml_path):
-                         return
-                
-                print(f"File changed: {os.path.relpath(path, WATCH_DIR)}")
-                self._trigger_build()
+            print(f"File changed: {os.path.relpath(path, WATCH_DIR)}")
+            with self._lock:
+                self._pending.add(path)
+            self._trigger_build()
 
-    def run_build():
+    def _is_watched_root(name):
+        # Hidden dirs (.metafor cache, editor state) are never bundled, so skip them as well
+        return name not in IGNORE_DIRS and not name.startswith('.') and not name.endswith('.egg-info')
+
+    def run_build(changed=None):
         print("Rebuilding...")
         try:
-            build_project(WATCH_DIR, output_type='py')
+            is_watched = None
+            if changed is not None:
+                # The bundler sees resolved paths; only those under the watched root count
+                real_dir = os.path.realpath(WATCH_DIR)
+                derived = {os.path.realpath(p) for p in state['derived_pys']}
+                is_watched = lambda path: (path.startswith(real_dir + os.sep)
+                                           and _is_watched_path(path, real_dir, derived))
+            build_project(WATCH_DIR, output_type='py', changed=changed, is_watched=is_watched)
             print("Build finished. Watching...")
             state['last_build_time'] = time.time()
-            with build_condition:
-                build_condition.notify_all()
+            state['derived_pys'] = _collect_derived_pys(WATCH_DIR)
+            _INJECT_CACHE.clear()
+            sse_clients.broadcast(b"data: reload\n\n")
         except Exception as e:
              print(f"\033[91mBuild failed: {e}\033[0m")
 
     def start_watcher():
         print(f"Watching {WATCH_DIR} for changes...")
         event_handler = DebouncedBuildHandler(run_build)
-        observer = Observer()
-        observer.schedule(event_handler, WATCH_DIR, recursive=True)
+        observer = None
+        if use_daemon:
+            from . import daemon
+            if daemon.is_supported():
+                try:
+                    observer = daemon.DaemonObserver(on_reconnect=event_handler.request_full_build)
+                    print("Using shared watcher daemon")
+                except OSError as e:
+                    print(f"Could not reach watcher daemon ({e}); watching in-process")
+            else:
+                print("Watcher daemon needs UNIX sockets; watching in-process")
+        if observer is None:
+            observer = Observer()
+        event_handler.observer = observer
+        # Watch the project root itself non-recursively (top-level files such as
+        # app.ptml, index.html, pyscript.toml) and each non-ignored subdirectory
+        # recursively, so build output and tooling dirs never get inotify watches
+        observer.schedule(event_handler, WATCH_DIR, recursive=False)
+        for entry in os.scandir(WATCH_DIR):
+            if entry.is_dir() and _is_watched_root(entry.name):
+                observer.schedule(event_handler, entry.path, recursive=True)
         observer.start()
         try:
             while True:
@@ -99,15 +379,9 @@ def run_server(host, port):
                 self.send_header("Connection", "close")
                 self.end_headers()
                 
-                # Wait for build to finish
-                with build_condition:
-                    build_condition.wait()
-                
-                try:
-                    self.wfile.write(b"data: reload\n\n")
-                    self.wfile.flush()
-                except BrokenPipeError:
-                    pass
+                # Hand the connection over instead of waiting here for the next build;
+                # the server skips closing it (see shutdown_request below)
+                sse_clients.add(self.connection)
                 return
 
             if not path.startswith("/metafor/"):
@@ -115,57 +389,54 @@ def run_server(host, port):
             
             # Intercept HTML files to inject reload script
             if self.path.endswith('.html') or self.path.endswith('/'):
-                local_path = os.path.join(os.getcwd(), self.path.lstrip('/'))
-                if os.path.isdir(local_path):
+                local_path = os.path.join(project_path, self.path.lstrip('/'))
+                # One stat answers "exists?", "directory?" and feeds the cache key
+                try:
+                    st = os.stat(local_path)
+                except OSError:
+                    st = None
+                if st is not None and stat.S_ISDIR(st.st_mode):
                     local_path = os.path.join(local_path, 'index.html')
+                    try:
+                        st = os.stat(local_path)
+                    except OSError:
+                        st = None
                 
-                if os.path.exists(local_path) and local_path.endswith('.html'):
+                if st is not None and local_path.endswith('.html'):
                     try:
-                        with open(local_path, 'rb') as f:
-                            content = f.read()
-                        
-                        # Inject script
-                        script = b"""
-<script>
-(function() {
-    const evtSource = new EventSource("/_metafor/events");
-    evtSource.onmessage = function(event) {
-        if (event.data === "reload") {
-            console.log("Reload signal received, reloading...");
-            window.location.reload();
-        }
-    };
-    evtSource.onerror = function(err) {
-        // EventSource errors are expected during development (connection interruptions)
-        // These are harmless and don't affect the app functionality
-    };
-})();
-</script>
-</body>
-"""
-                        content = content.replace(b'</body>', script)
-                        
-                        self.send_response(200)
-                        self.send_header("Content-type", "text/html")
-                        self.send_header("Content-Length", str(len(content)))
-                        self.end_headers()
-                        self.wfile.write(content)
+                        self._send_with_reload_script(local_path, st)
                         return
                     except Exception as e:
                         print(f"Error injecting script: {e}")
 
             return super().do_GET()
 
+        def _send_with_reload_script(self, local_path, st):
+            # Browsers refetch the page on every reload, so keep the injected bytes
+            # until the file changes or a rebuild clears the cache
+            key = (local_path, st.st_mtime_ns, st.st_size)
+            content = _INJECT_CACHE.get(key)
+            if content is None:
+                content = _inject_reload_script(local_path)
+                _INJECT_CACHE[key] = content
+
+            self.send_response(200)
+            self.send_header("Content-type", "text/html")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def copyfile(self, source, outputfile):
+            # Static files: let the kernel send straight from the page cache to the
+            # socket (os.sendfile); socket.sendfile falls back to send() where unsupported
+            if outputfile is self.wfile:
+                self.connection.sendfile(source)
+            else:
+                super().copyfile(source, outputfile)
+
         def log_request(self, code='-', size='-'):
             if isinstance(code, int):
-                if 200 <= code < 300:
-                    code = f"\033[92m{code}\033[0m"
-                elif 400 <= code < 500:
-                    # Orange for Client Errors
-                    code = f"\033[38;5;208m{code}\033[0m" 
-                elif code >= 500:
-                    # Red for Server Errors
-                    code = f"\033[91m{code}\033[0m"
+                code = _colored_code(code)
             self.log_message('"%s" %s', self.requestline, str(code))
 
         def log_message(self, format, *args):
@@ -176,14 +447,20 @@ def run_server(host, port):
                              format % args))
 
         def end_headers(self):
-            self.send_header("Cache-Control", "no-store, no-cache, must-revalidate")
-            self.send_header("Pragma", "no-cache")
-            self.send_header("Expires", "0")
+            # Same as three send_header() calls, without formatting them on every response
+            if self.request_version != 'HTTP/0.9':
+                self._headers_buffer.append(_NOCACHE_HEADER_BLOB)
             super().end_headers()
 
     class ReusingThreadingHTTPServer(server.ThreadingHTTPServer):
         allow_reuse_address = True
 
+        def shutdown_request(self, request):
+            # Parked live-reload connections are closed by sse_clients, not per request
+            if sse_clients.owns(request):
+                return
+            super().shutdown_request(request)
+
     httpd = ReusingThreadingHTTPServer((host, port), Handler)
     display_host = host or 'localhost'
     print(f"\033[92mServing at http://{display_host}:{port}\033[0m")
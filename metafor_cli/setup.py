@@ -11,6 +11,7 @@ setup(
         "metafor",
         "watchdog",
         "libsass",
+        "tomli-w",
     ],
     entry_points={
         "console_scripts": [
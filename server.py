@@ -1,6 +1,7 @@
 import argparse
 import os
 import pathlib
+import stat
 import sys
 import threading
 import time
@@ -39,6 +40,82 @@ class Handler(server.SimpleHTTPRequestHandler):
         super().end_headers()
 
 
+# Pre-encoded no-cache headers appended to every live-reload response
+NOCACHE_HEADER_BLOB = (
+    b"Cache-Control: no-store, no-cache, must-revalidate\r\n"
+    b"Pragma: no-cache\r\n"
+    b"Expires: 0\r\n"
+)
+
+# Injected right before </body> in served HTML pages
+LIVE_RELOAD_SCRIPT = b"""
+<script>
+(function() {
+    const evtSource = new EventSource("/_metafor/events");
+    evtSource.onmessage = function(event) {
+        if (event.data === "reload") {
+            console.log("Reload signal received, reloading...");
+            window.location.reload();
+        }
+    };
+    evtSource.onerror = function(err) {
+        console.log("EventSource failed:", err);
+    };
+})();
+</script>
+"""
+
+# Injected pages keyed by (path, st_mtime_ns, st_size); cleared after every rebuild.
+# A plain dict rather than thread-local storage: the threading server uses a fresh
+# thread per request, so per-thread caches would never be hit.
+_INJECT_CACHE = {}
+
+def _inject_reload_script(local_path):
+    # Pages are small and always read whole: one unbuffered read of the exact size
+    # (no BufferedReader chunking), then join head + script + tail in one allocation
+    # rather than copying the page and then rescanning it with replace()
+    fd = os.open(local_path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, size, os.POSIX_FADV_SEQUENTIAL)
+        page = os.read(fd, size)
+        # A regular file normally comes back in one read; keep going if it did not
+        while len(page) < size:
+            chunk = os.read(fd, size - len(page))
+            if not chunk:
+                break
+            page += chunk
+    finally:
+        os.close(fd)
+
+    idx = page.rfind(b'</body>')
+    if idx == -1:
+        return page
+    with memoryview(page) as view:
+        return b''.join((view[:idx], LIVE_RELOAD_SCRIPT, view[idx:]))
+
+
+def _collect_derived_pys(root, ignore_dirs):
+    # .py paths that would be generated from a sibling .ptml; events for these are
+    # build by-products, so the watcher drops them without probing the filesystem
+    derived = []
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in ignore_dirs and not entry.name.endswith('.egg-info'):
+                        stack.append(entry.path)
+                elif entry.name.endswith('.ptml'):
+                    derived.append(entry.path[:-5] + '.py')
+    return frozenset(derived)
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="A simple HTTP server to serve examples of PuePy")
     parser.add_argument("--host", default="", help="The host on which the server runs")
@@ -46,59 +123,189 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     os.chdir(project_path)
+    # Resolved once; request handlers join against it instead of calling getcwd()
+    CWD = os.getcwd()
     
     # Start watcher in a separate thread
     WATCH_EXTENSIONS = {'.py', '.ptml', '.js', '.jsx', '.css', '.html', '.toml'}
     IGNORE_DIRS = {'build', '__pycache__', '.git', '.idea', '.vscode', 'node_modules'}
+    # Ignored directories as whole path components, plus egg-info metadata; substring
+    # tests avoid splitting every event path into a list
+    IGNORE_SUBSTRS = tuple(os.sep + d + os.sep for d in IGNORE_DIRS) + ('.egg-info',)
     # Build command relative to project root
     BUILD_CMD = ["./test_app/build.sh"]
     WATCH_DIR = project_path / "test_app"
     
     # Global variable to track build time
     last_build_time = time.time()
-    # Condition to notify waiting clients
-    build_condition = threading.Condition()
-
-    def get_file_mtimes(root_dir):
-        mtimes = {}
-        for root, dirs, files in os.walk(root_dir):
-            dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-            for file in files:
-                ext = os.path.splitext(file)[1]
-                if ext in WATCH_EXTENSIONS:
-                    path = os.path.join(root, file)
-                    try:
-                        mtimes[path] = os.path.getmtime(path)
-                    except OSError:
-                        pass
-        return mtimes
+    # Event the waiting live-reload clients sleep on. Each build swaps in a fresh one
+    # and sets the old, so waiters wake without contending for a shared lock.
+    build_event = [threading.Event()]
+    # .py paths shadowed by a sibling .ptml, refreshed after every build
+    derived_pys = [_collect_derived_pys(str(WATCH_DIR), IGNORE_DIRS)]
 
-    def run_watcher():
+    def run_build():
         global last_build_time
-        print(f"Watching {WATCH_DIR} for changes...")
-        last_mtimes = get_file_mtimes(WATCH_DIR)
+        print("\nChanges detected. Rebuilding...")
+        # Run build command from test_app directory to match original behavior
+        subprocess.run(["./build.sh"], cwd=WATCH_DIR)
+        print("Build finished. Watching...")
+        last_build_time = time.time()
+        derived_pys[0] = _collect_derived_pys(str(WATCH_DIR), IGNORE_DIRS)
         
-        while True:
-            time.sleep(1)
-            current_mtimes = get_file_mtimes(WATCH_DIR)
-            
-            changed = False
-            for path, mtime in current_mtimes.items():
-                if path not in last_mtimes or mtime > last_mtimes[path]:
-                    changed = True
-                    break
+        _INJECT_CACHE.clear()
+        
+        # Notify all waiting clients
+        done, build_event[0] = build_event[0], threading.Event()
+        done.set()
+
+    try:
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        # watchdog is optional for this dev script; fall back to raw inotify or polling below
+        Observer = None
+        import _inotify
+
+    if Observer is not None:
+        watch_root = str(WATCH_DIR)
+
+        # Watchdog Event Handler with Debouncing
+        class DebouncedBuildHandler(FileSystemEventHandler):
+            def __init__(self, callback, debounce_interval=0.1):
+                self.callback = callback
+                self.debounce_interval = debounce_interval
+                self.timer = None
+                
+            def _trigger_build(self):
+                if self.timer:
+                    self.timer.cancel()
+                self.timer = threading.Timer(self.debounce_interval, self._execute_build)
+                self.timer.start()
+                
+            def _execute_build(self):
+                self.callback()
+                
+            # Only content-changing events are handled. on_any_event would also see the
+            # opened/closed events the build itself produces when reading sources.
+            def on_modified(self, event):
+                if not event.is_directory:
+                    self._handle_path(event.src_path)
+
+            def on_created(self, event):
+                if not event.is_directory:
+                    self._handle_path(event.src_path)
+
+            def on_deleted(self, event):
+                if not event.is_directory:
+                    self._handle_path(event.src_path)
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    # Editors often save via write-to-temp + rename; the destination is what matters
+                    self._handle_path(event.dest_path)
+
+            def _handle_path(self, path):
+                # Strict Ignoring, relative to the watched dir so its own parents never match
+                rel_path = path[len(watch_root):] if path.startswith(watch_root) else path
+                if any(s in rel_path for s in IGNORE_SUBSTRS):
+                    return
+                
+                # Check for interesting extensions
+                ext = os.path.splitext(path)[1]
+                if ext in WATCH_EXTENSIONS:
+                    # Ignore .py files if they are derived from .ptml
+                    if ext == '.py' and path in derived_pys[0]:
+                        return
+                    
+                    self._trigger_build()
+
+        def run_watcher():
+            print(f"Watching {WATCH_DIR} for changes...")
+            observer = Observer()
+            observer.schedule(DebouncedBuildHandler(run_build), str(WATCH_DIR), recursive=True)
+            observer.start()
+            observer.join()
+    elif _inotify.available:
+        def is_watched(path):
+            if path is None:
+                # Event queue overflowed; changes may have been lost
+                return True
+            name = os.path.basename(path)
+            ext = name[name.rfind('.'):]
+            if ext not in WATCH_EXTENSIONS or '.egg-info' in path:
+                return False
+            # Ignore .py files if they are derived from .ptml
+            return not (ext == '.py' and path in derived_pys[0])
+
+        def run_watcher():
+            print(f"Watching {WATCH_DIR} for changes (inotify, watchdog not installed)...")
+            notifier = _inotify.Inotify(WATCH_DIR, IGNORE_DIRS)
+            while True:
+                # Sleep in select() until the kernel has something for us
+                notifier.wait()
+                changed = notifier.read_events()
+                # Debounce: keep draining while a save burst is still arriving
+                while notifier.wait(0.1):
+                    changed.extend(notifier.read_events())
+
+                if any(is_watched(path) for path in changed):
+                    run_build()
+    else:
+        def iter_file_mtimes(root_dir):
+            # scandir hands back cached dirents, so each watched file costs one stat
+            # (and none for the directory listing itself)
+            stack = [str(root_dir)]
+            while stack:
+                try:
+                    it = os.scandir(stack.pop())
+                except OSError:
+                    continue
+                with it:
+                    for entry in it:
+                        name = entry.name
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if name not in IGNORE_DIRS:
+                                    stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                if name[name.rfind('.'):] in WATCH_EXTENSIONS:
+                                    yield entry.path, entry.stat(follow_symlinks=False).st_mtime_ns
+                        except OSError:
+                            pass
+
+        def get_file_mtimes(root_dir):
+            return dict(iter_file_mtimes(root_dir))
+
+        def fingerprint(file_mtimes):
+            # Order-independent summary of (path, mtime) pairs plus a count; any add,
+            # delete or touch changes it, without materializing a dict per tick
+            h = 0
+            n = 0
+            for path, mtime in file_mtimes:
+                h ^= hash((path, mtime))
+                n += 1
+            return h, n
+
+        def run_watcher():
+            print(f"Watching {WATCH_DIR} for changes (polling, watchdog not installed)...")
+            last_mtimes = get_file_mtimes(WATCH_DIR)
+            last_fp = fingerprint(last_mtimes.items())
             
-            if changed:
-                print("\nChanges detected. Rebuilding...")
-                # Run build command from test_app directory to match original behavior
-                subprocess.run(["./build.sh"], cwd=WATCH_DIR)
-                print("Build finished. Watching...")
-                last_build_time = time.time()
-                last_mtimes = current_mtimes
+            while True:
+                time.sleep(1)
+                if fingerprint(iter_file_mtimes(WATCH_DIR)) == last_fp:
+                    continue
+
+                # Something changed: take a full snapshot to report what
+                current_mtimes = get_file_mtimes(WATCH_DIR)
+                for path, mtime in current_mtimes.items():
+                    if last_mtimes.get(path) != mtime:
+                        print(f"File changed: {os.path.relpath(path, WATCH_DIR)}")
                 
-                # Notify all waiting clients
-                with build_condition:
-                    build_condition.notify_all()
+                run_build()
+                last_mtimes = current_mtimes
+                last_fp = fingerprint(current_mtimes.items())
 
     watcher_thread = threading.Thread(target=run_watcher, daemon=True)
     watcher_thread.start()
@@ -115,8 +322,7 @@ if __name__ == "__main__":
                 self.end_headers()
                 
                 # Wait for build to finish
-                with build_condition:
-                    build_condition.wait()
+                build_event[0].wait()
                 
                 try:
                     self.wfile.write(b"data: reload\n\n")
@@ -145,40 +351,22 @@ if __name__ == "__main__":
                 # We are in project_path.
                 # self.path starts with /
                 
-                local_path = os.path.join(os.getcwd(), self.path.lstrip('/'))
-                if os.path.isdir(local_path):
+                local_path = os.path.join(CWD, self.path.lstrip('/'))
+                # One stat answers "exists?", "directory?" and feeds the cache key
+                try:
+                    st = os.stat(local_path)
+                except OSError:
+                    st = None
+                if st is not None and stat.S_ISDIR(st.st_mode):
                     local_path = os.path.join(local_path, 'index.html')
+                    try:
+                        st = os.stat(local_path)
+                    except OSError:
+                        st = None
                 
-                if os.path.exists(local_path) and local_path.endswith('.html'):
+                if st is not None and local_path.endswith('.html'):
                     try:
-                        with open(local_path, 'rb') as f:
-                            content = f.read()
-                        
-                        # Inject script
-                        script = b"""
-<script>
-(function() {
-    const evtSource = new EventSource("/_metafor/events");
-    evtSource.onmessage = function(event) {
-        if (event.data === "reload") {
-            console.log("Reload signal received, reloading...");
-            window.location.reload();
-        }
-    };
-    evtSource.onerror = function(err) {
-        console.log("EventSource failed:", err);
-    };
-})();
-</script>
-</body>
-"""
-                        content = content.replace(b'</body>', script)
-                        
-                        self.send_response(200)
-                        self.send_header("Content-type", "text/html")
-                        self.send_header("Content-Length", str(len(content)))
-                        self.end_headers()
-                        self.wfile.write(content)
+                        self._send_with_reload_script(local_path, st)
                         return
                     except Exception as e:
                         print(f"Error injecting script: {e}")
@@ -186,13 +374,36 @@ if __name__ == "__main__":
 
             return super().do_GET()
 
+        def _send_with_reload_script(self, local_path, st):
+            # Browsers refetch the page on every reload, so keep the injected bytes
+            # until the file changes or a rebuild clears the cache
+            key = (local_path, st.st_mtime_ns, st.st_size)
+            content = _INJECT_CACHE.get(key)
+            if content is None:
+                content = _inject_reload_script(local_path)
+                _INJECT_CACHE[key] = content
+
+            self.send_response(200)
+            self.send_header("Content-type", "text/html")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def copyfile(self, source, outputfile):
+            # Static files: let the kernel send straight from the page cache to the
+            # socket (os.sendfile); socket.sendfile falls back to send() where unsupported
+            if outputfile is self.wfile:
+                self.connection.sendfile(source)
+            else:
+                super().copyfile(source, outputfile)
+
         def end_headers(self):
             """
             Cache nothing!
             """
-            self.send_header("Cache-Control", "no-store, no-cache, must-revalidate")
-            self.send_header("Pragma", "no-cache")
-            self.send_header("Expires", "0")
+            # Same as three send_header() calls, without formatting them on every response
+            if self.request_version != 'HTTP/0.9':
+                self._headers_buffer.append(NOCACHE_HEADER_BLOB)
             super().end_headers()
 
     class ReusingThreadingHTTPServer(server.ThreadingHTTPServer):
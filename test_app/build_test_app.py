@@ -1,16 +1,16 @@
+import os
 import sys
-from unittest.mock import MagicMock
 
-# Mock JS environment
-sys.modules['js'] = MagicMock()
-sys.modules['pyodide'] = MagicMock()
-sys.modules['pyodide.ffi'] = MagicMock()
+# Add root to path to find metafor, and the CLI package that holds the bundler
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(_ROOT)
+sys.path.append(os.path.join(_ROOT, 'metafor_cli'))
 
-import os
-# Add root to path to find metafor
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Same browser-module stubs as the CLI build and the test suite
+from metafor_cli.builder import install_browser_stubs
+install_browser_stubs()
 
-from metafor.bundler import MetaforBundler
+from metafor_cli.bundler import MetaforBundler
 
 def main():
     # Build test_app
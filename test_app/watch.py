@@ -1,73 +1,256 @@
 
 import os
+import stat
 import time
 import subprocess
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-WATCH_EXTENSIONS = {'.py', '.ptml', '.js', '.jsx', '.css', '.html', '.toml'}
-IGNORE_DIRS = {'build', '__pycache__', '.git', '.idea', '.vscode', 'node_modules'}
+WATCH_EXTENSIONS = frozenset({'.py', '.ptml', '.js', '.jsx', '.css', '.html', '.toml'})
+IGNORE_DIRS = frozenset({'build', '__pycache__', '.git', '.idea', '.vscode', 'node_modules'})
 BUILD_CMD = ["./build.sh"]
 
-def get_file_mtimes(root_dir):
-    mtimes = {}
-    for root, dirs, files in os.walk(root_dir):
-        # Filter ignored directories
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
-        
-        for file in files:
-            ext = os.path.splitext(file)[1]
-            if ext in WATCH_EXTENSIONS:
-                path = os.path.join(root, file)
+# Suffix tuple for str.endswith: one C-level call per file name, no split or slice
+WATCH_SUFFIXES = tuple(WATCH_EXTENSIONS)
+# Threads that stat files for the initial snapshot; METAFOR_WATCH_WORKERS=1 keeps it serial
+WATCH_WORKERS = int(os.environ.get('METAFOR_WATCH_WORKERS', '8'))
+
+# fwalk hands out an open fd per directory so each stat resolves one name, not the full path
+_HAS_FWALK = hasattr(os, 'fwalk') and os.stat in os.supports_dir_fd
+
+def _walk_watched(root_dir, with_stat=True):
+    # The one tree walk behind every scan: prunes IGNORE_DIRS, keeps watched suffixes and
+    # yields (path, st) per regular file, where st is its lstat result (None when
+    # with_stat is False, for callers that stat elsewhere)
+    if _HAS_FWALK and with_stat:
+        # Every stat is relative to the open directory fd instead of re-walking each
+        # component of the full path in the kernel
+        for root, dirs, files, dir_fd in os.fwalk(root_dir):
+            dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
+            for name in files:
+                if not name.endswith(WATCH_SUFFIXES):
+                    continue
                 try:
-                    mtimes[path] = os.path.getmtime(path)
+                    st = os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
                 except OSError:
-                    pass
-    return mtimes
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    yield os.path.join(root, name), st
+        return
 
-def main():
-    root_dir = "."
-    print(f"Watching {root_dir} for changes in {WATCH_EXTENSIONS}...")
-    print(f"Ignoring: {IGNORE_DIRS}")
-    
+    # scandir yields cached dirents (no extra stat for is_dir/is_file) and each watched
+    # file costs at most one stat. Iterative over a deque of directories: no generator
+    # frame per directory and no recursion limit on deep trees.
+    dirs = deque([root_dir])
+    while dirs:
+        try:
+            it = os.scandir(dirs.pop())
+        except OSError:
+            # Directory removed mid-scan; os.walk skipped these silently too
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORE_DIRS:
+                        dirs.append(entry.path)
+                elif entry.name.endswith(WATCH_SUFFIXES) and entry.is_file(follow_symlinks=False):
+                    if not with_stat:
+                        yield entry.path, None
+                        continue
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    yield entry.path, st
+
+def scan_changed(root_dir, last_mtimes, seen):
+    # last_mtimes is updated in place and only (path, mtime, is_added) for files that
+    # differ is yielded, so an idle tick builds no new snapshot
+    for path, st in _walk_watched(root_dir):
+        mtime = st.st_mtime_ns
+        seen.add(path)
+        prev = last_mtimes.get(path)
+        if prev != mtime:
+            last_mtimes[path] = mtime
+            yield path, mtime, prev is None
+
+def _watched_paths(root_dir):
+    # Walk only (no stat), for the parallel baseline below
+    return [path for path, _ in _walk_watched(root_dir, with_stat=False)]
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path, follow_symlinks=False).st_mtime_ns
+    except OSError:
+        return None
+
+def get_file_mtimes(root_dir):
+    if WATCH_WORKERS <= 1:
+        # Filled by the same in-place updater the polling ticks use
+        mtimes = {}
+        for _ in scan_changed(root_dir, mtimes, set()):
+            pass
+        return mtimes
+
+    # Walk in this thread, overlap the stat syscalls across a pool (they dominate on
+    # network or otherwise slow filesystems)
+    paths = _watched_paths(root_dir)
+    with ThreadPoolExecutor(max_workers=WATCH_WORKERS) as executor:
+        mtimes = executor.map(_mtime_ns, paths, chunksize=64)
+        return {path: mtime for path, mtime in zip(paths, mtimes) if mtime is not None}
+
+def _is_watched(path):
+    # Filter at the event so writes under build/, node_modules/ etc. never wake the loop
+    if not path.endswith(WATCH_SUFFIXES):
+        return False
+    return not any(part in IGNORE_DIRS for part in os.path.relpath(path).split(os.sep))
+
+class BuildRunner:
+    # Runs BUILD_CMD in the background so the watcher keeps seeing saves during a
+    # build; changes that arrive mid-build are coalesced into one follow-up build
+    def __init__(self):
+        self.proc = None
+        self.pending = False
+
+    @property
+    def busy(self):
+        return self.proc is not None
+
+    def request(self, message=''):
+        if self.proc is not None and self.proc.poll() is None:
+            self.pending = True
+            _write(message)
+            return
+        self._start(message)
+
+    def poll(self):
+        # Call regularly: reports a finished build and starts a queued one
+        if self.proc is not None and self.proc.poll() is not None:
+            self.proc = None
+            if self.pending:
+                self._start("Build finished. Watching...\n")
+            else:
+                _write("Build finished. Watching...\n")
+
+    def _start(self, message=''):
+        _write(message + "Running build...\n")
+        self.pending = False
+        self.proc = subprocess.Popen(BUILD_CMD)
+
+def _write(text):
+    # One write and flush per report instead of a print (and tty flush) per line
+    if text:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+def run_build(runner, added, modified):
+    buf = ["\nChanges detected:\n"]
+    buf.extend(f"  Added: {p}\n" for p in added)
+    buf.extend(f"  Modified: {p}\n" for p in modified)
+    runner.request(''.join(buf))
+
+def watch_events(root_dir, Observer, FileSystemEventHandler, debounce=0.4, step=0.05):
+    # Sleep until the kernel reports a change (inotify / FSEvents / ReadDirectoryChangesW),
+    # then wait for the burst to settle before building once
+    lock = threading.Lock()
+    pending = {}
+    wake = threading.Event()
+    state = {'last_event': 0.0}
+
+    class Handler(FileSystemEventHandler):
+        def _record(self, path, is_added):
+            if not _is_watched(path):
+                return
+            with lock:
+                # A file created then modified in one burst still counts as added
+                pending[path] = pending.get(path, False) or is_added
+                state['last_event'] = time.monotonic()
+            wake.set()
+
+        def on_created(self, event):
+            if not event.is_directory:
+                self._record(event.src_path, True)
+
+        def on_modified(self, event):
+            if not event.is_directory:
+                self._record(event.src_path, False)
+
+        def on_moved(self, event):
+            if not event.is_directory:
+                self._record(event.dest_path, True)
+
+    runner = BuildRunner()
+    observer = Observer()
+    observer.schedule(Handler(), root_dir, recursive=True)
+    observer.start()
+    try:
+        while True:
+            # Only wake periodically while a build is running, to notice it finishing
+            if not wake.wait(step if runner.busy else None):
+                runner.poll()
+                continue
+            while True:
+                time.sleep(step)
+                runner.poll()
+                with lock:
+                    if time.monotonic() - state['last_event'] >= debounce:
+                        changes = dict(pending)
+                        pending.clear()
+                        wake.clear()
+                        break
+            added = [p for p, is_added in changes.items() if is_added]
+            modified = [p for p, is_added in changes.items() if not is_added]
+            run_build(runner, added, modified)
+    finally:
+        observer.stop()
+        observer.join()
+
+def poll(root_dir):
+    # Single persistent snapshot, updated in place by scan_changed()
     last_mtimes = get_file_mtimes(root_dir)
     
     # Run build initially
     # print("Running initial build...")
     # subprocess.run(BUILD_CMD)
     
+    runner = BuildRunner()
+    while True:
+        time.sleep(1)
+        runner.poll()
+        seen = set()
+        added = []
+        modified = []
+        
+        for path, mtime, is_added in scan_changed(root_dir, last_mtimes, seen):
+            (added if is_added else modified).append(path)
+        
+        # Forget deleted files so a re-created one is reported as added
+        if len(seen) != len(last_mtimes):
+            for path in last_mtimes.keys() - seen:
+                del last_mtimes[path]
+        
+        if added or modified:
+            run_build(runner, added, modified)
+
+def main():
+    root_dir = "."
+    print(f"Watching {root_dir} for changes in {WATCH_EXTENSIONS}...")
+    print(f"Ignoring: {IGNORE_DIRS}")
+    
     try:
-        while True:
-            time.sleep(1)
-            current_mtimes = get_file_mtimes(root_dir)
-            
-            changed = False
-            added = []
-            modified = []
-            
-            # Check for modified or added files
-            for path, mtime in current_mtimes.items():
-                if path not in last_mtimes:
-                    added.append(path)
-                    changed = True
-                elif mtime > last_mtimes[path]:
-                    modified.append(path)
-                    changed = True
-            
-            # Check for deleted files (optional, but good for completeness)
-            # deleted = [p for p in last_mtimes if p not in current_mtimes]
-            # if deleted: changed = True
-            
-            if changed:
-                print("\nChanges detected:")
-                for p in added: print(f"  Added: {p}")
-                for p in modified: print(f"  Modified: {p}")
-                
-                print("Running build...")
-                subprocess.run(BUILD_CMD)
-                print("Build finished. Watching...")
-                
-            last_mtimes = current_mtimes
-            
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+    except ImportError:
+        # watchdog is optional; without it fall back to polling the tree every second
+        Observer = None
+    
+    try:
+        if Observer is not None:
+            watch_events(root_dir, Observer, FileSystemEventHandler)
+        else:
+            poll(root_dir)
     except KeyboardInterrupt:
         print("\nStopping watcher.")
 
@@ -1,28 +1,74 @@
-import sys
 import os
-from unittest.mock import MagicMock
 
-# Mock js module for local testing
-sys.modules['js'] = MagicMock()
-sys.modules['pyodide'] = MagicMock()
-sys.modules['pyodide.ffi'] = MagicMock()
+import pytest
 
-# Add the project root to sys.path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+if __name__ == "__main__":
+    # Browser-module stubs and sys.path come from conftest.py, so hand the run to
+    # pytest before the imports below need them
+    raise SystemExit(pytest.main([__file__]))
+
+from metafor.transpiler import jsx_to_dom_func, jsx_transpiler
 
-from metafor.transpiler import jsx_to_dom_func
+COUNTER_JSX = os.path.abspath(os.path.join(os.path.dirname(__file__), 'app/jsx/counter.jsx'))
 
 def test_transpiler():
-    print("--- Testing counter.jsx ---")
-    counter_jsx_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'app/jsx/counter.jsx'))
-    try:
-        output = jsx_to_dom_func(counter_jsx_path)
-        print("Output Code:")
-        print(output)
-    except Exception as e:
-        print(f"Error transpiling counter.jsx: {e}")
-        import traceback
-        traceback.print_exc()
+    output = jsx_to_dom_func(COUNTER_JSX)
 
-if __name__ == "__main__":
-    test_transpiler()
+    # The generated code is a single Python expression
+    compile(output, COUNTER_JSX, 'eval')
+
+    assert output.startswith('t.div({"class_name": lambda: f"counter theme-{theme()}"}, [')
+    assert '"onclick": increment' in output
+    assert '"onclick": lambda : set_tab(\'home\')' in output
+    for component in ("Show(", "For(", "Switch(", "Match(", "Portal(", "ErrorBoundary(", "Demo("):
+        assert component in output, component
+
+def test_inline_template():
+    assert jsx_to_dom_func('<p class_name="a">Hi {name}</p>') == (
+        't.p({"class_name": "a"}, [\n  "Hi ",\n  name\n])'
+    )
+    assert jsx_to_dom_func('<p>Hi</p>', css_variable='_css') == 't.p({}, [\n  "Hi"\n], css=_css)'
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    # Start from an empty cache and count how often a template is actually parsed
+    monkeypatch.setattr(jsx_transpiler, "_JSX_CACHE", {})
+    calls = []
+    load = jsx_transpiler.load_jsx_as_docstring
+    def counting_load(template):
+        calls.append(template)
+        return load(template)
+    monkeypatch.setattr(jsx_transpiler, "load_jsx_as_docstring", counting_load)
+    return calls
+
+def test_cache_reuses_unchanged_file(parse_count):
+    first = jsx_to_dom_func(COUNTER_JSX)
+    assert jsx_to_dom_func(COUNTER_JSX) is first
+    assert len(parse_count) == 1
+
+def test_cache_regenerates_on_mtime_change(tmp_path, parse_count):
+    jsx = tmp_path / "greet.jsx"
+    jsx.write_text("<p>Hello</p>")
+    assert jsx_to_dom_func(str(jsx)) == 't.p({}, [\n  "Hello"\n])'
+
+    # Same length, and the mtime is moved explicitly so coarse filesystem clocks still differ
+    jsx.write_text("<p>Howdy</p>")
+    mtime_ns = jsx.stat().st_mtime_ns + 1_000_000_000
+    os.utime(jsx, ns=(mtime_ns, mtime_ns))
+    assert jsx_to_dom_func(str(jsx)) == 't.p({}, [\n  "Howdy"\n])'
+    assert len(parse_count) == 2
+
+def test_cache_keys_files_by_css_variable(parse_count):
+    plain = jsx_to_dom_func(COUNTER_JSX)
+    scoped = jsx_to_dom_func(COUNTER_JSX, css_variable="_css")
+    assert plain != scoped
+    assert scoped.endswith("css=_css)")
+
+    assert jsx_to_dom_func(COUNTER_JSX) is plain
+    assert jsx_to_dom_func(COUNTER_JSX, css_variable="_css") is scoped
+    assert len(parse_count) == 2
+
+def test_inline_templates_not_cached(parse_count):
+    assert jsx_to_dom_func("<p>Hi</p>") == jsx_to_dom_func("<p>Hi</p>")
+    assert len(parse_count) == 2
+    assert jsx_transpiler._JSX_CACHE == {}
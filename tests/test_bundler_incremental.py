@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from metafor_cli import bundler
+from metafor_cli.bundler import MetaforBundler
+
+WATCHED = ('.py', '.ptml')
+
+def _is_watched(path):
+    return path.endswith(WATCHED)
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+@pytest.fixture(autouse=True)
+def _restore_sys_path(monkeypatch):
+    # MetaforBundler puts the framework's parent dir on sys.path; undo it per test
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+
+def _project(tmp_path):
+    src = str(tmp_path / "proj")
+    framework = str(tmp_path / "fwpkg")
+    _write(os.path.join(src, "app.py"), "x = 1\n")
+    _write(os.path.join(src, "manifest.json"), '{"v": 1}')
+    _write(os.path.join(framework, "__init__.py"), "VERSION = 1\n")
+    return src, framework
+
+def _build(src, framework, **kwargs):
+    bundler = MetaforBundler(src_dir=src, out_dir=os.path.join(src, "build"),
+                             framework_dir=framework, use_pyc=False)
+    bundler.build(**kwargs)
+
+def test_unwatched_asset_rebuilt_with_change_set(tmp_path):
+    src, framework = _project(tmp_path)
+    _build(src, framework)
+
+    # manifest.json is not a watched extension, so the watcher never reports it
+    _write(os.path.join(src, "manifest.json"), '{"v": 2}')
+    _build(src, framework, changed={os.path.join(src, "app.py")}, is_watched=_is_watched)
+
+    assert _read(os.path.join(src, "build", "manifest.json")) == '{"v": 2}'
+
+def test_framework_rebuilt_with_change_set(tmp_path):
+    src, framework = _project(tmp_path)
+    _build(src, framework)
+
+    # The framework lives outside the watched project, so its edits are never reported
+    _write(os.path.join(framework, "__init__.py"), "VERSION = 2\n")
+    _build(src, framework, changed={os.path.join(src, "app.py")}, is_watched=_is_watched)
+
+    staged = os.path.join(src, "build", "_staging_", "fwpkg", "__init__.py")
+    assert _read(staged) == "VERSION = 2\n"
+
+def test_reported_watched_file_rebuilt(tmp_path):
+    src, framework = _project(tmp_path)
+    _build(src, framework)
+
+    _write(os.path.join(src, "app.py"), "x = 2\n")
+    _build(src, framework, changed={os.path.join(src, "app.py")}, is_watched=_is_watched)
+
+    assert _read(os.path.join(src, "build", "_staging_", "app.py")) == "x = 2\n"
+
+def test_failed_batch_followed_by_partial_batch(tmp_path, monkeypatch):
+    src, framework = _project(tmp_path)
+    a, b = os.path.join(src, "a.ptml"), os.path.join(src, "b.ptml")
+    _write(a, "A1")
+    _write(b, "B1")
+
+    def compile_source(source, filename):
+        if source == "broken":
+            raise SyntaxError("bad ptml")
+        if filename.endswith("a.ptml"):
+            # Let b's failure surface first, so a's output is never written
+            time.sleep(0.2)
+        return f"SOURCE = {source!r}\n"
+    monkeypatch.setattr(bundler, "_compile_ptml_source", compile_source)
+    _build(src, framework)
+
+    _write(a, "A2")
+    _write(b, "broken")
+    with pytest.raises(SyntaxError):
+        _build(src, framework, changed={a, b}, is_watched=_is_watched)
+
+    # Only b is saved again; a's edit from the failed batch must still reach staging
+    _write(b, "B2")
+    _build(src, framework, changed={b}, is_watched=_is_watched)
+    assert _read(os.path.join(src, "build", "_staging_", "a.py")) == "SOURCE = 'A2'\n"
+    assert _read(os.path.join(src, "build", "_staging_", "b.py")) == "SOURCE = 'B2'\n"
+
+def test_framework_cache_keys_relative_to_framework(tmp_path):
+    src, framework = _project(tmp_path)
+    _build(src, framework)
+
+    # The framework sits outside the project; its keys must not climb out with "../"
+    keys = json.loads(_read(os.path.join(src, ".metafor", "cache.json")))["files"]
+    assert "framework:__init__.py" in keys
+    assert "app.py" in keys
+    assert not any(".." in key for key in keys)
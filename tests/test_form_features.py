@@ -1,28 +1,11 @@
 import asyncio
-import sys
-import os
-
-# Ensure we can import the package
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
-
-# MOCK ENVIRONMENT setup must happen BEFORE importing metafor
-from unittest.mock import MagicMock
-if 'js' not in sys.modules:
-    js_mock = MagicMock()
-    js_mock.document = MagicMock()
-    js_mock.console = MagicMock()
-    js_mock.setTimeout = MagicMock()
-    sys.modules['js'] = js_mock
-
-if 'pyodide' not in sys.modules:
-    sys.modules['pyodide'] = MagicMock()
-if 'pyodide.ffi' not in sys.modules:
-    pyodide_ffi_mock = MagicMock()
-    pyodide_ffi_mock.create_proxy = MagicMock(side_effect=lambda x: x)
-    pyodide_ffi_mock.JsProxy = MagicMock
-    sys.modules['pyodide.ffi'] = pyodide_ffi_mock
-
-print("Environment mocked inline.")
+
+import pytest
+
+if __name__ == "__main__":
+    # Browser-module stubs and sys.path come from conftest.py, so hand the run to
+    # pytest before the imports below need them
+    raise SystemExit(pytest.main([__file__]))
 
 from metafor.form.form import create_form, Form
 from metafor.form.schema import Schema
@@ -51,6 +34,13 @@ def test_deep_initial_values():
     assert data["config"]["notifications"] is True # Should still be default
     print("  ✓ Overrides work correctly")
 
+    # Test 3: Repeated path reads follow writes (parsed paths are cached, values are not)
+    assert form.get_nested_value("config.theme") == "light"
+    form.set_nested_value("config.theme", "dark")
+    assert form.get_nested_value("config.theme") == "dark"
+    assert form.get_nested_value("config.missing") is None
+    print("  ✓ Nested path reads track updates")
+
 def test_nested_array_defaults():
     print("Testing Nested Array Defaults...")
     schema = Schema()
@@ -130,6 +120,37 @@ def test_cross_field_validation():
     assert valid
     print("  ✓ Cross-validators passed")
 
+    # Validators that declare their keys only re-run when those values change
+    calls = []
+    def keyed_match(data):
+        calls.append(1)
+        return passwords_match(data)
+
+    keyed_schema = Schema()
+    keyed_schema.field("password").string()
+    keyed_schema.field("confirm_password").string()
+    keyed_schema.add_validator(keyed_match, keys=("password", "confirm_password"))
+
+    assert "confirm_password" in keyed_schema.validate({"password": "abc", "confirm_password": "xyz"})
+    assert "confirm_password" in keyed_schema.validate({"password": "abc", "confirm_password": "xyz"})
+    assert len(calls) == 1
+    assert keyed_schema.validate({"password": "abc", "confirm_password": "abc"}) == {}
+    assert len(calls) == 2
+    print("  ✓ Keyed cross-validators skip unchanged inputs")
+
+    # Dotted keys are resolved through nested data, not looked up as flat keys
+    def nested_match(data):
+        user = data.get("user", {})
+        if user.get("pw") != user.get("cpw"):
+            return {"user.cpw": ["mismatch"]}
+        return None
+
+    nested_schema = Schema()
+    nested_schema.add_validator(nested_match, keys=["user.pw", "user.cpw"])
+    assert "user.cpw" in nested_schema.validate({"user": {"pw": "a", "cpw": "b"}})
+    assert nested_schema.validate({"user": {"pw": "a", "cpw": "a"}}) == {}
+    print("  ✓ Keyed cross-validators resolve dotted keys")
+
 def test_clean_api():
     print("Testing Clean API (FieldAccessProxy)...")
     schema = Schema()
@@ -175,22 +196,14 @@ def test_clean_api():
     assert form.F.user.email.error == "Must be a valid email address."
     print("  ✓ Validation metadata works")
 
-def run_tests():
-    try:
-        test_deep_initial_values()
-        test_nested_array_defaults()
-        test_nested_field_validation()
-        test_cross_field_validation()
-        test_clean_api()
-        print("\nAll tests passed!")
-    except AssertionError as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-    except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
-
-if __name__ == "__main__":
-    run_tests()
+    # 6. Test the called handle reflects writes made after it was first resolved
+    schema = Schema()
+    schema.field("email").string()
+    form = create_form(schema, initial_values={"email": ""})
+    before = form.F.email()
+    assert not before.dirty and not before.touched
+    form.F.email.set_value("x")
+    after = form.F.email()
+    assert after.dirty and after.touched
+    assert after.value() == "x"
+    print("  ✓ Called handle meta tracks writes")
@@ -1,14 +1,4 @@
 import unittest
-import sys
-from unittest.mock import MagicMock
-
-# Mock browser-specific modules
-sys.modules['js'] = MagicMock()
-sys.modules['pyodide'] = MagicMock()
-sys.modules['pyodide.ffi'] = MagicMock()
-
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../metafor_cli')))
 
 from metafor.compiler.compiler import MetaforCompiler
 
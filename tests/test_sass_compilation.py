@@ -1,18 +1,17 @@
-import sys
-from unittest.mock import MagicMock
+import logging
 
-# Mock Browser Environment for local testing
-sys.modules['js'] = MagicMock()
-sys.modules['pyodide'] = MagicMock()
-sys.modules['pyodide.ffi'] = MagicMock()
+import pytest
 
-from metafor.compiler import MetaforCompiler
+# Skip cleanly instead of failing inside the compile call when libsass is missing
+pytest.importorskip("sass")
 
-def test_inline_sass():
-    print("Testing inline Sass compilation...")
-    compiler = MetaforCompiler()
-    
-    source = """
+# libsass-bound tests share one xdist worker under --dist loadgroup
+pytestmark = pytest.mark.xdist_group("sass")
+
+# Progress goes to logging: silent under -q, shown with --log-cli-level=DEBUG
+logger = logging.getLogger(__name__)
+
+_INLINE_SASS_SOURCE = """
 @component
 def TestComponent():
     return <div>Hello</div>
@@ -34,33 +33,23 @@ def TestComponent():
     }
 }
 """
+
+def test_inline_sass(cached_compile):
+    logger.info("Testing inline Sass compilation...")
     
-    try:
-        compiled_code = compiler.compile(source, filename="test.ptml")
+    compiled_code = cached_compile(_INLINE_SASS_SOURCE, "test.ptml")
+    
+    # Check if compiled CSS is present in the output
+    if 'color: #ff0000' in compiled_code or 'color: red' in compiled_code:
+        logger.debug("SUCCESS: Sass variable $primary compiled to color.")
+    else:
+        pytest.fail(f"Could not find compiled color. Compiled code:\n{compiled_code}")
         
-        # Check if compiled CSS is present in the output
-        if 'color: #ff0000' in compiled_code or 'color: red' in compiled_code:
-            print("SUCCESS: Sass variable $primary compiled to color.")
-        else:
-            print("FAILURE: Could not find compiled color.")
-            print("Compiled Code snippet:")
-            print(compiled_code)
-            sys.exit(1)
-            
-        if '.container:hover' in compiled_code:
-             print("SUCCESS: Sass nesting compiled.")
-        else:
-             print("FAILURE: Could not find nested selector.")
-             sys.exit(1)
-
-        print("\nFull Compiled Code:")
-        print(compiled_code)
-
-    except Exception as e:
-        print(f"Compilation ERROR: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+    if '.container:hover' in compiled_code:
+         logger.debug("SUCCESS: Sass nesting compiled.")
+    else:
+         pytest.fail(f"Could not find nested selector. Compiled code:\n{compiled_code}")
 
 if __name__ == "__main__":
-    test_inline_sass()
+    # The compile cache fixture comes from conftest.py
+    raise SystemExit(pytest.main([__file__]))
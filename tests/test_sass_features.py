@@ -1,18 +1,17 @@
-import sys
-from unittest.mock import MagicMock
+import logging
 
-# Mock Browser Environment
-sys.modules['js'] = MagicMock()
-sys.modules['pyodide'] = MagicMock()
-sys.modules['pyodide.ffi'] = MagicMock()
+import pytest
 
-from metafor.compiler import MetaforCompiler
+# Skip cleanly instead of failing inside the compile call when libsass is missing
+pytest.importorskip("sass")
 
-def test_sass_features():
-    print("Testing Sass mixins, includes, and extends...")
-    compiler = MetaforCompiler()
-    
-    source = """
+# libsass-bound tests share one xdist worker under --dist loadgroup
+pytestmark = pytest.mark.xdist_group("sass")
+
+# Progress goes to logging: silent under -q, shown with --log-cli-level=DEBUG
+logger = logging.getLogger(__name__)
+
+_FEATURES_SASS_SOURCE = """
 @component
 def TestComponent():
     return <div>Feature Test</div>
@@ -36,41 +35,28 @@ def TestComponent():
     }
 }
 """
-    
-    try:
-        compiled_code = compiler.compile(source, filename="test_features.ptml")
-        
-        # Verify Mixin (@include theme-color)
-        if 'color: green' in compiled_code and 'background: black' in compiled_code:
-            print("SUCCESS: @mixin and @include verified.")
-        else:
-            print("FAILURE: @include did not apply styles.")
-            print(compiled_code)
-            sys.exit(1)
 
-        # Verify Extend (@extend .base-button)
-        # LibSass usually groups selectors: .base-button, .my-button { border: 1px solid red; }
-        if '.base-button, .my-button' in compiled_code or '.my-button, .base-button' in compiled_code:
-             print("SUCCESS: @extend verified (selector grouping detected).")
-        # Alternative output depending on optimization
-        elif 'border: 1px solid red' in compiled_code:
-             print("SUCCESS: @extend verified (styles present).")
-        else:
-             print("FAILURE: @extend did not apply styles or group selectors.")
-             print(compiled_code)
-             sys.exit(1)
-
-        print("\nFull Compiled Code Snippet:")
-        # Print just the styles part
-        start = compiled_code.find('inline_styles =')
-        end = compiled_code.find('app_styles =', start)
-        print(compiled_code[start:end+50] + "...")
-
-    except Exception as e:
-        print(f"Compilation ERROR: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+def test_sass_features(cached_compile):
+    logger.info("Testing Sass mixins, includes, and extends...")
+    
+    compiled_code = cached_compile(_FEATURES_SASS_SOURCE, "test_features.ptml")
+    
+    # Verify Mixin (@include theme-color)
+    if 'color: green' in compiled_code and 'background: black' in compiled_code:
+        logger.debug("SUCCESS: @mixin and @include verified.")
+    else:
+        pytest.fail(f"@include did not apply styles. Compiled code:\n{compiled_code}")
+
+    # Verify Extend (@extend .base-button)
+    # LibSass usually groups selectors: .base-button, .my-button { border: 1px solid red; }
+    if '.base-button, .my-button' in compiled_code or '.my-button, .base-button' in compiled_code:
+         logger.debug("SUCCESS: @extend verified (selector grouping detected).")
+    # Alternative output depending on optimization
+    elif 'border: 1px solid red' in compiled_code:
+         logger.debug("SUCCESS: @extend verified (styles present).")
+    else:
+         pytest.fail(f"@extend did not apply styles or group selectors. Compiled code:\n{compiled_code}")
 
 if __name__ == "__main__":
-    test_sass_features()
+    # The compile cache fixture comes from conftest.py
+    raise SystemExit(pytest.main([__file__]))